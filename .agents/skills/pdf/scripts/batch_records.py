@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+
+
+
+
+def read_jsonl_records(records_jsonl_path: str) -> list:
+    records = []
+    with open(records_jsonl_path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{records_jsonl_path} line {line_number}: {e}") from None
+    return records
+
+
+def record_output_path(output_dir: str, name: str, index: int, used: dict) -> str:
+    # Rejects output names that escape output_dir or that another record
+    # already claimed; `used` maps resolved paths to record indexes.
+    path = os.path.realpath(os.path.join(output_dir, name))
+    if os.path.dirname(path) != os.path.realpath(output_dir):
+        raise ValueError(f"Record {index}: output name {name!r} is not a file name inside {output_dir}")
+    if path in used:
+        raise ValueError(f"Record {index}: output name {name!r} is already used by record {used[path]}")
+    used[path] = index
+    return path
+
+
+def map_records(record_fn, jobs: list, workers: int, initializer, initargs=()):
+    # Yields record_fn(job) for each job in order, across a process pool when
+    # workers > 1; each worker calls initializer once. Results are produced as
+    # they are consumed, so callers can handle and drop them one at a time.
+    # record_fn must report its own errors.
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            yield from pool.map(record_fn, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+        return
+    initializer(*initargs)
+    for job in jobs:
+        yield record_fn(job)
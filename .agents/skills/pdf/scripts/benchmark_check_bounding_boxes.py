@@ -0,0 +1,63 @@
+import random
+import sys
+import time
+
+from check_bounding_boxes import get_bounding_box_issues, rects_intersect
+
+
+
+
+def make_synthetic_form(num_fields, fields_per_page=250, overlap_rate=0.01, seed=0):
+    rng = random.Random(seed)
+    form_fields = []
+    for i in range(num_fields):
+        page = i // fields_per_page + 1
+        slot = i % fields_per_page
+        row, col = divmod(slot, 5)
+        x = 20 + col * 115
+        y = 20 + row * 15
+        label = [x, y, x + 50, y + 12]
+        entry = [x + 52, y, x + 110, y + 12]
+        if rng.random() < overlap_rate:
+            entry = [entry[0] - 10, entry[1], entry[2], entry[3]]
+        form_fields.append({
+            "page_number": page,
+            "description": f"field {i}",
+            "label_bounding_box": label,
+            "entry_bounding_box": entry,
+            "entry_text": {"text": "x", "font_size": 10},
+        })
+    return {"form_fields": form_fields}
+
+
+def naive_intersection_count(fields):
+    rects = []
+    for f in fields["form_fields"]:
+        rects.append((f["page_number"], f["label_bounding_box"]))
+        rects.append((f["page_number"], f["entry_bounding_box"]))
+    count = 0
+    for i in range(len(rects)):
+        for j in range(i + 1, len(rects)):
+            if rects[i][0] == rects[j][0] and rects_intersect(rects[i][1], rects[j][1]):
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    num_fields = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    fields = make_synthetic_form(num_fields)
+
+    start = time.perf_counter()
+    issues = get_bounding_box_issues(fields)
+    indexed_time = time.perf_counter() - start
+    intersections = sum(1 for issue in issues if issue["type"] == "intersection")
+    print(f"Grid index: {intersections} intersections among {num_fields} fields in {indexed_time * 1000:.1f} ms")
+
+    if "--skip-naive" not in sys.argv:
+        start = time.perf_counter()
+        expected = naive_intersection_count(fields)
+        naive_time = time.perf_counter() - start
+        print(f"All pairs:  {expected} intersections in {naive_time * 1000:.1f} ms")
+        if expected != intersections:
+            print("MISMATCH between grid index and all-pairs results")
+            sys.exit(1)
@@ -1,10 +1,16 @@
+from collections import defaultdict
 from dataclasses import dataclass
+import argparse
 import json
+import statistics
 import sys
 
 
 
 
+MAX_MESSAGES = 20
+
+
 @dataclass
 class RectAndField:
     rect: list[float]
@@ -12,54 +18,127 @@ class RectAndField:
     field: dict
 
 
-def get_bounding_box_messages(fields_json_stream) -> list[str]:
-    messages = []
-    fields = json.load(fields_json_stream)
-    messages.append(f"Read {len(fields['form_fields'])} fields")
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
+def find_intersecting_pairs(rects: list[list[float]]) -> list[tuple[int, int]]:
+    # Uniform grid hash: each rect is bucketed into every cell it covers, so only
+    # rects sharing a cell are compared. Cell size follows the typical rect size.
+    if len(rects) < 2:
+        return []
 
+    cell_size = max(
+        statistics.median(max(r[2] - r[0], r[3] - r[1]) for r in rects),
+        1.0,
+    )
+    grid = defaultdict(list)
+    for i, r in enumerate(rects):
+        for cx in range(int(r[0] // cell_size), int(r[2] // cell_size) + 1):
+            for cy in range(int(r[1] // cell_size), int(r[3] // cell_size) + 1):
+                grid[(cx, cy)].append(i)
+
+    pairs = set()
+    for bucket in grid.values():
+        for a in range(len(bucket)):
+            i = bucket[a]
+            for b in range(a + 1, len(bucket)):
+                j = bucket[b]
+                if (i, j) not in pairs and rects_intersect(rects[i], rects[j]):
+                    pairs.add((i, j))
+    return sorted(pairs)
+
+
+def get_bounding_box_issues(fields: dict) -> list[dict]:
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
-    has_error = False
+    indices_by_page = defaultdict(list)
+    for i, rf in enumerate(rects_and_fields):
+        indices_by_page[rf.field["page_number"]].append(i)
+
+    overlaps_by_index = defaultdict(list)
+    for indices in indices_by_page.values():
+        page_rects = [rects_and_fields[i].rect for i in indices]
+        for a, b in find_intersecting_pairs(page_rects):
+            overlaps_by_index[indices[a]].append(indices[b])
+
+    def describe(rf):
+        return {"description": rf.field["description"], "rect_type": rf.rect_type, "rect": rf.rect}
+
+    issues = []
     for i, ri in enumerate(rects_and_fields):
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in sorted(overlaps_by_index.get(i, [])):
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
-        if ri.rect_type == "entry":
-            if "entry_text" in ri.field:
-                font_size = ri.field["entry_text"].get("font_size", 14)
-                entry_height = ri.rect[3] - ri.rect[1]
-                if entry_height < font_size:
-                    has_error = True
-                    messages.append(f"FAILURE: entry bounding box height ({entry_height}) for `{ri.field['description']}` is too short for the text content (font size: {font_size}). Increase the box height or decrease the font size.")
-                    if len(messages) >= 20:
-                        messages.append("Aborting further checks; fix bounding boxes and try again")
-                        return messages
-
-    if not has_error:
+            issues.append({
+                "type": "intersection",
+                "page_number": ri.field["page_number"],
+                "same_field": ri.field is rj.field,
+                "first": describe(ri),
+                "second": describe(rj),
+            })
+        if ri.rect_type == "entry" and "entry_text" in ri.field:
+            font_size = ri.field["entry_text"].get("font_size", 14)
+            entry_height = ri.rect[3] - ri.rect[1]
+            if entry_height < font_size:
+                issues.append({
+                    "type": "entry_too_short",
+                    "page_number": ri.field["page_number"],
+                    "entry_height": entry_height,
+                    "font_size": font_size,
+                    "first": describe(ri),
+                })
+    return issues
+
+
+def format_issue(issue: dict) -> str:
+    first = issue["first"]
+    if issue["type"] == "entry_too_short":
+        return f"FAILURE: entry bounding box height ({issue['entry_height']}) for `{first['description']}` is too short for the text content (font size: {issue['font_size']}). Increase the box height or decrease the font size."
+    second = issue["second"]
+    if issue["same_field"]:
+        return f"FAILURE: intersection between label and entry bounding boxes for `{first['description']}` ({first['rect']}, {second['rect']})"
+    return f"FAILURE: intersection between {first['rect_type']} bounding box for `{first['description']}` ({first['rect']}) and {second['rect_type']} bounding box for `{second['description']}` ({second['rect']})"
+
+
+def get_bounding_box_messages(fields_json_stream, max_messages=MAX_MESSAGES) -> list[str]:
+    messages = []
+    fields = json.load(fields_json_stream)
+    messages.append(f"Read {len(fields['form_fields'])} fields")
+
+    issues = get_bounding_box_issues(fields)
+    for issue in issues:
+        messages.append(format_issue(issue))
+        if max_messages and len(messages) >= max_messages:
+            messages.append("Aborting further checks; fix bounding boxes and try again")
+            return messages
+
+    if not issues:
         messages.append("SUCCESS: All bounding boxes are valid")
     return messages
 
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: check_bounding_boxes.py [fields.json]")
-        sys.exit(1)
-    with open(sys.argv[1]) as f:
-        messages = get_bounding_box_messages(f)
+    parser = argparse.ArgumentParser(usage="check_bounding_boxes.py [fields.json] [--json | --all]")
+    parser.add_argument("fields_json")
+    parser.add_argument("--json", action="store_true", help="Print every issue as JSON")
+    parser.add_argument("--all", action="store_true", help=f"Print every issue instead of stopping after {MAX_MESSAGES} messages")
+    args = parser.parse_args()
+
+    with open(args.fields_json) as f:
+        if args.json:
+            fields = json.load(f)
+            issues = get_bounding_box_issues(fields)
+            print(json.dumps({
+                "field_count": len(fields["form_fields"]),
+                "success": not issues,
+                "issues": issues,
+            }, indent=2))
+            sys.exit(0)
+        messages = get_bounding_box_messages(f, max_messages=0 if args.all else MAX_MESSAGES)
     for msg in messages:
         print(msg)
@@ -1,33 +1,82 @@
+import argparse
 import os
-import sys
 
 from pdf2image import convert_from_path
+from pypdf import PdfReader
 
 
 
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+RENDER_DPI = 200
 
-    for i, image in enumerate(images):
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
 
-    print(f"Converted {len(images)} pages to PNG images")
+def page_long_sides(pdf_path, dpi=RENDER_DPI):
+    # Longest side of each page in pixels when rendered at `dpi`, from the crop box
+    # that pdftoppm renders.
+    sides = []
+    for page in PdfReader(pdf_path).pages:
+        box = page.cropbox
+        sides.append(max(float(box.width), float(box.height)) * dpi / 72)
+    return sides
+
+
+def _render(pdf_path, first_page, last_page, oversized, max_dim, thread_count):
+    if oversized:
+        # Straight at the target size instead of rendering large and shrinking
+        return convert_from_path(pdf_path, first_page=first_page, last_page=last_page, size=max_dim, thread_count=thread_count)
+    return convert_from_path(pdf_path, first_page=first_page, last_page=last_page, dpi=RENDER_DPI, thread_count=thread_count)
+
+
+def convert(pdf_path, output_dir, max_dim=1000, batch_size=10, thread_count=1):
+    # Pages are rendered in batches of `batch_size` and saved before the next
+    # batch is rendered, so memory use is bounded by one batch regardless of page
+    # count. Pages are rendered at 200 DPI; only pages that would exceed
+    # `max_dim` on their longest side are rendered at `max_dim` instead, so
+    # smaller pages are never upscaled.
+    long_sides = page_long_sides(pdf_path)
+    page_count = len(long_sides)
+
+    for batch_start in range(1, page_count + 1, batch_size):
+        batch_end = min(batch_start + batch_size - 1, page_count)
+
+        # Consecutive pages on the same side of the cap share one render call
+        first_page = batch_start
+        while first_page <= batch_end:
+            oversized = long_sides[first_page - 1] > max_dim
+            last_page = first_page
+            while last_page < batch_end and (long_sides[last_page] > max_dim) == oversized:
+                last_page += 1
+
+            images = _render(pdf_path, first_page, last_page, oversized, max_dim, thread_count)
+            for page_number, image in enumerate(images, first_page):
+                width, height = image.size
+                if width > max_dim or height > max_dim:
+                    # Box estimate and renderer rounding can differ by a pixel
+                    scale_factor = min(max_dim / width, max_dim / height)
+                    resized = image.resize((int(width * scale_factor), int(height * scale_factor)))
+                    image.close()
+                    image = resized
+                image_path = os.path.join(output_dir, f"page_{page_number}.png")
+                image.save(image_path)
+                print(f"Saved page {page_number} as {image_path} (size: {image.size})")
+                image.close()
+            first_page = last_page + 1
+
+    print(f"Converted {page_count} pages to PNG images")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: convert_pdf_to_images.py [input pdf] [output directory]")
-        sys.exit(1)
-    pdf_path = sys.argv[1]
-    output_directory = sys.argv[2]
-    convert(pdf_path, output_directory)
+    parser = argparse.ArgumentParser(usage="convert_pdf_to_images.py [input pdf] [output directory] [options]")
+    parser.add_argument("pdf_path")
+    parser.add_argument("output_directory")
+    parser.add_argument("--max-dim", type=int, default=1000, help="Cap on the longest side of each image in pixels; smaller pages keep their 200 DPI size (default: 1000)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Pages rendered per batch (default: 10)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Parallel pdftoppm workers per batch (default: CPU count)")
+    args = parser.parse_args()
+    convert(
+        args.pdf_path,
+        args.output_directory,
+        max_dim=args.max_dim,
+        batch_size=args.batch_size,
+        thread_count=args.threads,
+    )
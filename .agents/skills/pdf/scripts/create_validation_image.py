@@ -1,34 +1,121 @@
 import json
+import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image, ImageDraw
 
 
 
 
+CONTACT_SHEET_COLUMNS = 4
+CONTACT_SHEET_THUMBNAIL_WIDTH = 400
+
+
+def group_fields_by_page(data):
+    fields_by_page = defaultdict(list)
+    for field in data["form_fields"]:
+        fields_by_page[field["page_number"]].append(field)
+    return fields_by_page
+
+
+def draw_validation_boxes(img, fields):
+    draw = ImageDraw.Draw(img)
+    for field in fields:
+        draw.rectangle(field['entry_bounding_box'], outline='red', width=2)
+        draw.rectangle(field['label_bounding_box'], outline='blue', width=2)
+    return 2 * len(fields)
+
+
 def create_validation_image(page_number, fields_json_path, input_path, output_path):
     with open(fields_json_path, 'r') as f:
         data = json.load(f)
 
         img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        num_boxes = 0
-        
-        for field in data["form_fields"]:
-            if field["page_number"] == page_number:
-                entry_box = field['entry_bounding_box']
-                label_box = field['label_bounding_box']
-                draw.rectangle(entry_box, outline='red', width=2)
-                draw.rectangle(label_box, outline='blue', width=2)
-                num_boxes += 2
-        
+        num_boxes = draw_validation_boxes(img, group_fields_by_page(data).get(page_number, []))
+
         img.save(output_path)
         print(f"Created validation image at {output_path} with {num_boxes} bounding boxes")
 
 
+def _render_page_overlay(page_number, fields, input_path, output_path, thumbnail_width):
+    # Runs in a worker thread; Pillow releases the GIL while decoding and encoding.
+    with Image.open(input_path) as img:
+        img = img.convert("RGB")
+    num_boxes = draw_validation_boxes(img, fields)
+    img.save(output_path)
+
+    thumbnail = None
+    if thumbnail_width:
+        thumbnail = img.copy()
+        thumbnail.thumbnail((thumbnail_width, thumbnail_width * 4))
+    img.close()
+    return page_number, num_boxes, thumbnail
+
+
+def create_contact_sheet(thumbnails, output_path, columns=CONTACT_SHEET_COLUMNS):
+    cell_width = max(t.width for t in thumbnails)
+    cell_height = max(t.height for t in thumbnails)
+    rows = (len(thumbnails) + columns - 1) // columns
+    sheet = Image.new("RGB", (cell_width * min(columns, len(thumbnails)), cell_height * rows), "white")
+    for i, thumbnail in enumerate(thumbnails):
+        row, col = divmod(i, columns)
+        sheet.paste(thumbnail, (col * cell_width, row * cell_height))
+    sheet.save(output_path)
+    print(f"Created contact sheet at {output_path} with {len(thumbnails)} pages")
+
+
+def create_validation_images(fields_json_path, images_dir, output_dir, contact_sheet_path=None, workers=None):
+    # Validation overlays for every page in one run. Fields are grouped by page
+    # once, page images (page_N.png, as written by convert_pdf_to_images.py) are
+    # drawn concurrently, and an optional contact sheet shows every page at once.
+    with open(fields_json_path, 'r') as f:
+        data = json.load(f)
+    fields_by_page = group_fields_by_page(data)
+
+    page_numbers = sorted(
+        int(name[len("page_"):-len(".png")])
+        for name in os.listdir(images_dir)
+        if name.startswith("page_") and name.endswith(".png") and name[len("page_"):-len(".png")].isdigit()
+    )
+    if not page_numbers:
+        print(f"No page_N.png images found in {images_dir}")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    thumbnail_width = CONTACT_SHEET_THUMBNAIL_WIDTH if contact_sheet_path else 0
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        results = list(pool.map(
+            lambda n: _render_page_overlay(
+                n,
+                fields_by_page.get(n, []),
+                os.path.join(images_dir, f"page_{n}.png"),
+                os.path.join(output_dir, f"page_{n}.png"),
+                thumbnail_width,
+            ),
+            page_numbers,
+        ))
+
+    for page_number, num_boxes, _ in results:
+        print(f"Created validation image for page {page_number} with {num_boxes} bounding boxes")
+
+    missing = sorted(set(fields_by_page) - set(page_numbers))
+    if missing:
+        print(f"WARNING: no page image for pages with fields: {missing}")
+
+    if contact_sheet_path:
+        create_contact_sheet([thumbnail for _, _, thumbnail in results], contact_sheet_path)
+
+
 if __name__ == "__main__":
+    if len(sys.argv) in (5, 6) and sys.argv[1] == "--all":
+        contact_sheet_path = sys.argv[5] if len(sys.argv) == 6 else None
+        create_validation_images(sys.argv[2], sys.argv[3], sys.argv[4], contact_sheet_path)
+        sys.exit(0)
     if len(sys.argv) != 5:
         print("Usage: create_validation_image.py [page number] [fields.json file] [input image path] [output image path]")
+        print("       create_validation_image.py --all [fields.json file] [page images dir] [output dir] [contact sheet path]")
         sys.exit(1)
     page_number = int(sys.argv[1])
     fields_json_path = sys.argv[2]
@@ -1,19 +1,40 @@
+import hashlib
 import json
+import os
 import sys
+import tempfile
 
 from pypdf import PdfReader
 
 
 
 
-def get_full_annotation_field_id(annotation):
-    components = []
+INDEX_VERSION = 1
+
+
+def _object_key(obj):
+    ref = getattr(obj, "indirect_reference", None)
+    return (ref.idnum, ref.generation) if ref is not None else id(obj)
+
+
+def get_full_annotation_field_id(annotation, cache=None):
+    # Walks up the /Parent chain until it reaches an object whose ID is already in
+    # `cache`, then fills in the IDs of everything it passed on the way back down.
+    chain = []
+    field_id = None
     while annotation:
-        field_name = annotation.get('/T')
-        if field_name:
-            components.append(field_name)
+        key = _object_key(annotation)
+        if cache is not None and key in cache:
+            field_id = cache[key]
+            break
+        chain.append((key, annotation.get('/T')))
         annotation = annotation.get('/Parent')
-    return ".".join(reversed(components)) if components else None
+    for key, field_name in reversed(chain):
+        if field_name:
+            field_id = f"{field_id}.{field_name}" if field_id else str(field_name)
+        if cache is not None:
+            cache[key] = field_id
+    return field_id
 
 
 def make_field_dict(field, field_id):
@@ -44,7 +65,70 @@ def make_field_dict(field, field_id):
     return field_dict
 
 
-def get_field_info(reader: PdfReader):
+def build_annotation_index(reader: PdfReader, radio_names):
+    field_id_cache = {}
+    index = []
+    for page_index, page in enumerate(reader.pages):
+        for ann in page.get('/Annots', []):
+            ann = ann.get_object()
+            field_id = get_full_annotation_field_id(ann, field_id_cache)
+            if field_id is None:
+                continue
+            entry = {"field_id": field_id, "page": page_index + 1, "rect": ann.get('/Rect')}
+            if field_id in radio_names:
+                try:
+                    entry["on_values"] = [v for v in ann["/AP"]["/N"] if v != "/Off"]
+                except KeyError:
+                    pass
+            index.append(entry)
+    return index
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_index_file(cache_path, data):
+    # Written to a temp file and renamed into place, so concurrent readers never
+    # see a half-written index.
+    fd, tmp_path = tempfile.mkstemp(prefix=".field_index.", suffix=".tmp", dir=os.path.dirname(cache_path) or ".")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_annotation_index(pdf_path, reader: PdfReader, radio_names, write=False):
+    # Reused from <pdf>.field_index.json while the file's SHA-256 is unchanged;
+    # the cache is only (re)written when `write` is set.
+    cache_path = f"{pdf_path}.field_index.json"
+    file_hash = _file_sha256(pdf_path)
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if (isinstance(cached, dict) and cached.get("version") == INDEX_VERSION
+                and cached.get("sha256") == file_hash and isinstance(cached.get("annotations"), list)):
+            return cached["annotations"]
+    except (OSError, TypeError, ValueError):
+        pass
+
+    index = build_annotation_index(reader, radio_names)
+    if write:
+        try:
+            _write_index_file(cache_path, {"version": INDEX_VERSION, "sha256": file_hash, "annotations": index})
+        except (OSError, TypeError, ValueError):
+            pass
+    return index
+
+
+def get_field_info(reader: PdfReader, pdf_path=None, write_index=False):
     fields = reader.get_fields()
 
     field_info_by_id = {}
@@ -58,33 +142,34 @@ def get_field_info(reader: PdfReader):
         field_info_by_id[field_id] = make_field_dict(field, field_id)
 
 
+    if pdf_path is not None:
+        annotation_index = load_annotation_index(pdf_path, reader, possible_radio_names, write_index)
+    else:
+        annotation_index = build_annotation_index(reader, possible_radio_names)
+
     radio_fields_by_id = {}
 
-    for page_index, page in enumerate(reader.pages):
-        annotations = page.get('/Annots', [])
-        for ann in annotations:
-            field_id = get_full_annotation_field_id(ann)
-            if field_id in field_info_by_id:
-                field_info_by_id[field_id]["page"] = page_index + 1
-                field_info_by_id[field_id]["rect"] = ann.get('/Rect')
-            elif field_id in possible_radio_names:
-                try:
-                    on_values = [v for v in ann["/AP"]["/N"] if v != "/Off"]
-                except KeyError:
-                    continue
-                if len(on_values) == 1:
-                    rect = ann.get("/Rect")
-                    if field_id not in radio_fields_by_id:
-                        radio_fields_by_id[field_id] = {
-                            "field_id": field_id,
-                            "type": "radio_group",
-                            "page": page_index + 1,
-                            "radio_options": [],
-                        }
-                    radio_fields_by_id[field_id]["radio_options"].append({
-                        "value": on_values[0],
-                        "rect": rect,
-                    })
+    for entry in annotation_index:
+        field_id = entry["field_id"]
+        if field_id in field_info_by_id:
+            field_info_by_id[field_id]["page"] = entry["page"]
+            field_info_by_id[field_id]["rect"] = entry["rect"]
+        elif field_id in possible_radio_names:
+            on_values = entry.get("on_values")
+            if on_values is None:
+                continue
+            if len(on_values) == 1:
+                if field_id not in radio_fields_by_id:
+                    radio_fields_by_id[field_id] = {
+                        "field_id": field_id,
+                        "type": "radio_group",
+                        "page": entry["page"],
+                        "radio_options": [],
+                    }
+                radio_fields_by_id[field_id]["radio_options"].append({
+                    "value": on_values[0],
+                    "rect": entry["rect"],
+                })
 
     fields_with_location = []
     for field_info in field_info_by_id.values():
@@ -109,7 +194,7 @@ def get_field_info(reader: PdfReader):
 
 def write_field_info(pdf_path: str, json_output_path: str):
     reader = PdfReader(pdf_path)
-    field_info = get_field_info(reader)
+    field_info = get_field_info(reader, pdf_path)
     with open(json_output_path, "w") as f:
         json.dump(field_info, f, indent=2)
     print(f"Wrote {len(field_info)} fields to {json_output_path}")
@@ -9,15 +9,187 @@ This script analyzes the PDF to find:
 Output: A JSON file with the form structure that can be used to generate
 accurate field coordinates for filling.
 
-Usage: python extract_form_structure.py <input.pdf> <output.json>
+Pages are processed in parallel worker processes. With --pages-jsonl, each
+page's result is streamed to a JSONL file as it finishes, keyed by a hash of
+the page's content stream and the fonts and XObjects it uses, and pages
+already present there are not re-extracted.
+
+Usage: python extract_form_structure.py <input.pdf> <output.json> [--workers N] [--pages-jsonl PATH]
 """
 
+import argparse
+import hashlib
 import json
-import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pdfplumber
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+# Below this many pages, process start-up costs more than it saves.
+PARALLEL_MIN_PAGES = 16
+
+
+def extract_page_structure(page, page_num):
+    result = {
+        "page": {
+            "page_number": page_num,
+            "width": float(page.width),
+            "height": float(page.height)
+        },
+        "labels": [],
+        "lines": [],
+        "checkboxes": []
+    }
+
+    words = page.extract_words()
+    for word in words:
+        result["labels"].append({
+            "page": page_num,
+            "text": word["text"],
+            "x0": round(float(word["x0"]), 1),
+            "top": round(float(word["top"]), 1),
+            "x1": round(float(word["x1"]), 1),
+            "bottom": round(float(word["bottom"]), 1)
+        })
+
+    for line in page.lines:
+        if abs(float(line["x1"]) - float(line["x0"])) > page.width * 0.5:
+            result["lines"].append({
+                "page": page_num,
+                "y": round(float(line["top"]), 1),
+                "x0": round(float(line["x0"]), 1),
+                "x1": round(float(line["x1"]), 1)
+            })
+
+    for rect in page.rects:
+        width = float(rect["x1"]) - float(rect["x0"])
+        height = float(rect["bottom"]) - float(rect["top"])
+        if 5 <= width <= 15 and 5 <= height <= 15 and abs(width - height) < 2:
+            result["checkboxes"].append({
+                "page": page_num,
+                "x0": round(float(rect["x0"]), 1),
+                "top": round(float(rect["top"]), 1),
+                "x1": round(float(rect["x1"]), 1),
+                "bottom": round(float(rect["bottom"]), 1),
+                "center_x": round((float(rect["x0"]) + float(rect["x1"])) / 2, 1),
+                "center_y": round((float(rect["top"]) + float(rect["bottom"])) / 2, 1)
+            })
 
+    return result
+
+
+def _extract_pages(pdf_path, page_numbers):
+    # Runs in a worker process; each worker opens the PDF on its own.
+    with pdfplumber.open(pdf_path) as pdf:
+        return [extract_page_structure(pdf.pages[n - 1], n) for n in page_numbers]
+
+
+def get_page_content_hashes(pdf_path):
+    # A page's text and drawing can come from Form XObjects and fonts named in
+    # its content stream, so the resolved /Resources tree is hashed with it.
+    # Digests of indirect objects are shared across pages, so a font or image
+    # used on every page is only read once.
+    digests = {}
+
+    def digest(obj, active):
+        if isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            if key in digests:
+                return digests[key]
+            if key in active:
+                return f"cycle:{key}"
+            active.add(key)
+            result = digests[key] = digest(obj.get_object(), active)
+            active.discard(key)
+            return result
+
+        h = hashlib.sha256(type(obj).__name__.encode())
+        if isinstance(obj, DictionaryObject):
+            for key in sorted(obj):
+                h.update(f"{key}={digest(obj.raw_get(key), active)};".encode())
+            if isinstance(obj, StreamObject):
+                h.update(obj.get_data())
+        elif isinstance(obj, ArrayObject):
+            for item in obj:
+                h.update(f"{digest(item, active)},".encode())
+        else:
+            h.update(repr(obj).encode())
+        return h.hexdigest()
+
+    hashes = []
+    for page in PdfReader(pdf_path).pages:
+        geometry = [[float(v) for v in page.mediabox], [float(v) for v in page.cropbox], page.rotation]
+        h = hashlib.sha256(repr(geometry).encode())
+        contents = page.get_contents()
+        if contents is not None:
+            h.update(contents.get_data())
+        if "/Resources" in page:
+            h.update(digest(page.raw_get("/Resources"), set()).encode())
+        hashes.append(h.hexdigest())
+    return hashes
+
+
+def _load_page_records(pages_jsonl_path):
+    records = {}
+    if not pages_jsonl_path or not os.path.exists(pages_jsonl_path):
+        return records
+    with open(pages_jsonl_path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record["content_hash"]] = record
+    return records
+
+
+def _renumber(record, page_num):
+    result = {"page": dict(record["page"], page_number=page_num)}
+    for key in ("labels", "lines", "checkboxes"):
+        result[key] = [dict(item, page=page_num) for item in record[key]]
+    return result
+
+
+def extract_form_structure(pdf_path, workers=1, pages_jsonl_path=None):
+    # Pages are extracted independently, across `workers` processes. With
+    # `pages_jsonl_path`, each finished page is appended to that JSONL file with
+    # its content hash, and pages whose hash is already there are reused.
+    if pages_jsonl_path:
+        hashes = get_page_content_hashes(pdf_path)
+    else:
+        hashes = [None] * len(PdfReader(pdf_path).pages)
+
+    known = _load_page_records(pages_jsonl_path)
+    page_results = {}
+    for page_num, content_hash in enumerate(hashes, 1):
+        if content_hash in known:
+            page_results[page_num] = _renumber(known[content_hash], page_num)
+
+    todo = [n for n in range(1, len(hashes) + 1) if n not in page_results]
+    jsonl = open(pages_jsonl_path, "a") if pages_jsonl_path else None
+
+    def collect(results):
+        for result in results:
+            page_num = result["page"]["page_number"]
+            page_results[page_num] = result
+            if jsonl:
+                jsonl.write(json.dumps(dict(result, content_hash=hashes[page_num - 1])) + "\n")
+                jsonl.flush()
+
+    try:
+        if workers > 1 and len(todo) >= PARALLEL_MIN_PAGES:
+            chunk_size = max(1, len(todo) // (workers * 4))
+            chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_extract_pages, pdf_path, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    collect(future.result())
+        elif todo:
+            collect(_extract_pages(pdf_path, todo))
+    finally:
+        if jsonl:
+            jsonl.close()
 
-def extract_form_structure(pdf_path):
     structure = {
         "pages": [],
         "labels": [],
@@ -26,47 +198,12 @@ def extract_form_structure(pdf_path):
         "row_boundaries": []
     }
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            structure["pages"].append({
-                "page_number": page_num,
-                "width": float(page.width),
-                "height": float(page.height)
-            })
-
-            words = page.extract_words()
-            for word in words:
-                structure["labels"].append({
-                    "page": page_num,
-                    "text": word["text"],
-                    "x0": round(float(word["x0"]), 1),
-                    "top": round(float(word["top"]), 1),
-                    "x1": round(float(word["x1"]), 1),
-                    "bottom": round(float(word["bottom"]), 1)
-                })
-
-            for line in page.lines:
-                if abs(float(line["x1"]) - float(line["x0"])) > page.width * 0.5:
-                    structure["lines"].append({
-                        "page": page_num,
-                        "y": round(float(line["top"]), 1),
-                        "x0": round(float(line["x0"]), 1),
-                        "x1": round(float(line["x1"]), 1)
-                    })
-
-            for rect in page.rects:
-                width = float(rect["x1"]) - float(rect["x0"])
-                height = float(rect["bottom"]) - float(rect["top"])
-                if 5 <= width <= 15 and 5 <= height <= 15 and abs(width - height) < 2:
-                    structure["checkboxes"].append({
-                        "page": page_num,
-                        "x0": round(float(rect["x0"]), 1),
-                        "top": round(float(rect["top"]), 1),
-                        "x1": round(float(rect["x1"]), 1),
-                        "bottom": round(float(rect["bottom"]), 1),
-                        "center_x": round((float(rect["x0"]) + float(rect["x1"])) / 2, 1),
-                        "center_y": round((float(rect["top"]) + float(rect["bottom"])) / 2, 1)
-                    })
+    for page_num in sorted(page_results):
+        result = page_results[page_num]
+        structure["pages"].append(result["page"])
+        structure["labels"].extend(result["labels"])
+        structure["lines"].extend(result["lines"])
+        structure["checkboxes"].extend(result["checkboxes"])
 
     lines_by_page = {}
     for line in structure["lines"]:
@@ -89,15 +226,18 @@ def extract_form_structure(pdf_path):
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: extract_form_structure.py <input.pdf> <output.json>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(usage="extract_form_structure.py <input.pdf> <output.json> [--workers N] [--pages-jsonl PATH]")
+    parser.add_argument("pdf_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pages-jsonl", help="Stream per-page results here and skip pages already extracted into it")
+    args = parser.parse_args()
 
-    pdf_path = sys.argv[1]
-    output_path = sys.argv[2]
+    pdf_path = args.pdf_path
+    output_path = args.output_path
 
     print(f"Extracting structure from {pdf_path}...")
-    structure = extract_form_structure(pdf_path)
+    structure = extract_form_structure(pdf_path, workers=args.workers, pages_jsonl_path=args.pages_jsonl)
 
     with open(output_path, "w") as f:
         json.dump(structure, f, indent=2)
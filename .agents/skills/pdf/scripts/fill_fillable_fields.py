@@ -1,55 +1,134 @@
+import io
 import json
+import os
 import sys
+import time
 
 from pypdf import PdfReader, PdfWriter
 
+from batch_records import map_records, read_jsonl_records, record_output_path
 from extract_form_field_info import get_field_info
 
 
 
 
+class FormTemplate:
+    # Parses the PDF and its field map once; fill() can then be called for any
+    # number of value sets without re-reading the file or re-walking its pages.
+    def __init__(self, input_pdf_path: str, write_index: bool = False):
+        self.reader = PdfReader(input_pdf_path)
+        self.field_info = get_field_info(self.reader, input_pdf_path, write_index)
+        self.fields_by_ids = {f["field_id"]: f for f in self.field_info}
+
+        # The prepared writer is serialized and parsed back once; each fill()
+        # clones from that already-resolved copy instead of the original file.
+        writer = PdfWriter(clone_from=self.reader)
+        writer.set_need_appearances_writer(True)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        self.template = PdfReader(buffer)
+
+    def validate(self, fields) -> list[str]:
+        errors = []
+        for field in fields:
+            if not isinstance(field, dict):
+                errors.append(f"ERROR: Field entry {field!r} is not an object")
+                continue
+            existing_field = self.fields_by_ids.get(field.get("field_id"))
+            if not existing_field:
+                errors.append(f"ERROR: `{field.get('field_id')}` is not a valid field ID")
+            elif field.get("page") != existing_field["page"]:
+                errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field.get('page')}, expected {existing_field['page']})")
+            elif "value" in field:
+                err = validation_error_for_field_value(existing_field, field["value"])
+                if err:
+                    errors.append(err)
+        return errors
+
+    def fill(self, fields, output_pdf_path: str):
+        fields_by_page = {}
+        for field in fields:
+            if "value" in field:
+                fields_by_page.setdefault(field["page"], {})[field["field_id"]] = field["value"]
+
+        writer = PdfWriter(clone_from=self.template)
+        for page, field_values in fields_by_page.items():
+            writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
+
+        # update_page_form_field_values clears NeedAppearances, so set it again
+        writer.set_need_appearances_writer(True)
+
+        with open(output_pdf_path, "wb") as f:
+            writer.write(f)
+
+
 def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
     with open(fields_json_path) as f:
         fields = json.load(f)
-    fields_by_page = {}
-    for field in fields:
-        if "value" in field:
-            field_id = field["field_id"]
-            page = field["page"]
-            if page not in fields_by_page:
-                fields_by_page[page] = {}
-            fields_by_page[page][field_id] = field["value"]
-    
-    reader = PdfReader(input_pdf_path)
-
-    has_error = False
-    field_info = get_field_info(reader)
-    fields_by_ids = {f["field_id"]: f for f in field_info}
-    for field in fields:
-        existing_field = fields_by_ids.get(field["field_id"])
-        if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
-        elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
-        else:
-            if "value" in field:
-                err = validation_error_for_field_value(existing_field, field["value"])
-                if err:
-                    print(err)
-                    has_error = True
-    if has_error:
+
+    template = FormTemplate(input_pdf_path)
+
+    errors = template.validate(fields)
+    for err in errors:
+        print(err)
+    if errors:
         sys.exit(1)
 
-    writer = PdfWriter(clone_from=reader)
-    for page, field_values in fields_by_page.items():
-        writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
+    template.fill(fields, output_pdf_path)
 
-    writer.set_need_appearances_writer(True)
-    
-    with open(output_pdf_path, "wb") as f:
-        writer.write(f)
+
+_worker_template = None
+
+
+def _init_batch_worker(input_pdf_path: str, write_index: bool = False):
+    global _worker_template
+    monkeypatch_pydpf_method()
+    _worker_template = FormTemplate(input_pdf_path, write_index)
+
+
+def _fill_batch_record(job):
+    index, record, output_pdf_path = job
+    # A bad record must not take down the pool: every failure becomes this record's error
+    try:
+        fields = record.get("fields") if isinstance(record, dict) else record
+        if not isinstance(fields, list):
+            return index, output_pdf_path, ['ERROR: record must be a field list or an object with a "fields" list']
+        errors = _worker_template.validate(fields)
+        if errors:
+            return index, output_pdf_path, errors
+        _worker_template.fill(fields, output_pdf_path)
+    except Exception as e:
+        return index, output_pdf_path, [f"ERROR: {type(e).__name__}: {e}"]
+    return index, output_pdf_path, []
+
+
+def fill_pdf_fields_batch(input_pdf_path: str, records_jsonl_path: str, output_dir: str, workers: int = 1):
+    # Each JSONL line is either a field_values.json list, or an object with
+    # "fields" and an optional "output" file name.
+    jobs = []
+    used = {}
+    for index, record in enumerate(read_jsonl_records(records_jsonl_path), 1):
+        name = record.get("output") if isinstance(record, dict) else None
+        name = name if isinstance(name, str) and name else f"filled_{index:05d}.pdf"
+        jobs.append((index, record, record_output_path(output_dir, name, index, used)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    if workers > 1:
+        # Build and cache the annotation index before the pool starts, so the
+        # workers only ever read it.
+        get_field_info(PdfReader(input_pdf_path), input_pdf_path, write_index=True)
+    results = map_records(_fill_batch_record, jobs, workers, _init_batch_worker, (input_pdf_path, workers <= 1))
+
+    failed = 0
+    for index, output_pdf_path, errors in results:
+        if errors:
+            failed += 1
+            for err in errors:
+                print(f"Record {index}: {err}")
+    elapsed = time.perf_counter() - start
+    print(f"Filled {len(jobs) - failed} of {len(jobs)} PDFs into {output_dir} in {elapsed:.2f}s")
+    return failed == 0
 
 
 def validation_error_for_field_value(field_info, field_value):
@@ -76,6 +155,8 @@ def monkeypatch_pydpf_method():
     from pypdf.constants import FieldDictionaryAttributes
 
     original_get_inherited = DictionaryObject.get_inherited
+    if getattr(original_get_inherited, "_opt_patched", False):
+        return
 
     def patched_get_inherited(self, key: str, default = None):
         result = original_get_inherited(self, key, default)
@@ -84,12 +165,22 @@ def monkeypatch_pydpf_method():
                 result = [r[0] for r in result]
         return result
 
+    patched_get_inherited._opt_patched = True
     DictionaryObject.get_inherited = patched_get_inherited
 
 
 if __name__ == "__main__":
+    if len(sys.argv) in (5, 6) and sys.argv[1] == "--batch":
+        workers = int(sys.argv[5]) if len(sys.argv) == 6 else os.cpu_count() or 1
+        try:
+            ok = fill_pdf_fields_batch(sys.argv[2], sys.argv[3], sys.argv[4], workers)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        sys.exit(0 if ok else 1)
     if len(sys.argv) != 4:
         print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
+        print("       fill_fillable_fields.py --batch [input pdf] [records.jsonl] [output dir] [workers]")
         sys.exit(1)
     monkeypatch_pydpf_method()
     input_pdf = sys.argv[1]
@@ -1,9 +1,14 @@
+import io
 import json
+import os
 import sys
+import time
 
 from pypdf import PdfReader, PdfWriter
 from pypdf.annotations import FreeText
 
+from batch_records import map_records, read_jsonl_records, record_output_path
+
 
 
 
@@ -30,26 +35,19 @@ def transform_from_pdf_coords(bbox, pdf_height):
     return left, pypdf_bottom, right, pypdf_top
 
 
-def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
-    
-    with open(fields_json_path, "r") as f:
-        fields_data = json.load(f)
-    
-    reader = PdfReader(input_pdf_path)
-    writer = PdfWriter()
-    
-    writer.append(reader)
-    
+def compile_annotation_layout(reader, fields_data):
     pdf_dimensions = {}
     for i, page in enumerate(reader.pages):
         mediabox = page.mediabox
         pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
-    
-    annotations = []
+
+    pages_by_number = {p["page_number"]: p for p in fields_data["pages"]}
+
+    layout = []
     for field in fields_data["form_fields"]:
         page_num = field["page_number"]
 
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
+        page_info = pages_by_number[page_num]
         pdf_width, pdf_height = pdf_dimensions[page_num]
 
         if "pdf_width" in page_info:
@@ -65,27 +63,57 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
                 image_width, image_height,
                 float(pdf_width), float(pdf_height)
             )
-        
-        if "entry_text" not in field or "text" not in field["entry_text"]:
+        layout.append((field, page_num, transformed_entry_box))
+    return layout
+
+
+def build_annotations(layout, values=None):
+    # `values` maps a field's description to replacement text (or to a dict of
+    # entry_text overrides); fields not in `values` keep their own entry_text.
+    for field, page_num, rect in layout:
+        entry_text = field.get("entry_text")
+        if values and field["description"] in values:
+            override = values[field["description"]]
+            if not isinstance(override, dict):
+                override = {"text": override}
+            entry_text = {**(entry_text or {}), **override}
+
+        if not entry_text or "text" not in entry_text:
             continue
-        entry_text = field["entry_text"]
         text = entry_text["text"]
         if not text:
             continue
-        
+
         font_name = entry_text.get("font", "Arial")
         font_size = str(entry_text.get("font_size", 14)) + "pt"
         font_color = entry_text.get("font_color", "000000")
 
         annotation = FreeText(
-            text=text,
-            rect=transformed_entry_box,
+            text=str(text),
+            rect=rect,
             font=font_name,
             font_size=font_size,
             font_color=font_color,
             border_color=None,
             background_color=None,
         )
+        yield page_num, annotation
+
+
+def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
+    
+    with open(fields_json_path, "r") as f:
+        fields_data = json.load(f)
+    
+    reader = PdfReader(input_pdf_path)
+    writer = PdfWriter()
+    
+    writer.append(reader)
+    
+    layout = compile_annotation_layout(reader, fields_data)
+
+    annotations = []
+    for page_num, annotation in build_annotations(layout):
         annotations.append(annotation)
         writer.add_annotation(page_number=page_num - 1, annotation=annotation)
         
@@ -96,9 +124,103 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
     print(f"Added {len(annotations)} text annotations")
 
 
+_worker_state = None
+
+
+def _init_bulk_worker(input_pdf_path, fields_json_path):
+    global _worker_state
+    with open(fields_json_path, "r") as f:
+        fields_data = json.load(f)
+    reader = PdfReader(input_pdf_path)
+    _worker_state = (reader, compile_annotation_layout(reader, fields_data))
+
+
+def _fill_bulk_record(job):
+    index, record, output_pdf_path = job
+    if not isinstance(record, dict):
+        return index, None, ["ERROR: record must be an object mapping field descriptions to text"]
+
+    # A bad record must not take down the pool: every failure becomes this record's error
+    try:
+        reader, layout = _worker_state
+        values = record["values"] if isinstance(record.get("values"), dict) else record
+
+        writer = PdfWriter()
+        writer.append(reader)
+        for page_num, annotation in build_annotations(layout, values):
+            writer.add_annotation(page_number=page_num - 1, annotation=annotation)
+
+        if output_pdf_path is not None:
+            with open(output_pdf_path, "wb") as output:
+                writer.write(output)
+            return index, None, []
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return index, buffer.getvalue(), []
+    except Exception as e:
+        return index, None, [f"ERROR: {type(e).__name__}: {e}"]
+
+
+def fill_pdf_form_bulk(input_pdf_path, fields_json_path, records_jsonl_path, output_path, workers=1):
+    # One record per JSONL line: {"<field description>": "text", ...}, or
+    # {"values": {...}, "output": "name.pdf"}. If `output_path` ends in .pdf all
+    # records are concatenated into it, otherwise one PDF per record is written
+    # into that directory.
+    concatenate = output_path.lower().endswith(".pdf")
+
+    jobs = []
+    used = {}
+    for index, record in enumerate(read_jsonl_records(records_jsonl_path), 1):
+        if concatenate:
+            record_output = None
+        else:
+            name = record.get("output") if isinstance(record, dict) and isinstance(record.get("values"), dict) else None
+            name = name if isinstance(name, str) and name else f"filled_{index:05d}.pdf"
+            record_output = record_output_path(output_path, name, index, used)
+        jobs.append((index, record, record_output))
+    if not concatenate:
+        os.makedirs(output_path, exist_ok=True)
+
+    start = time.perf_counter()
+    results = map_records(_fill_bulk_record, jobs, workers, _init_bulk_worker, (input_pdf_path, fields_json_path))
+
+    # Results arrive in record order; in concatenate mode each one is appended
+    # to the merged document and its bytes dropped before the next is taken.
+    merged = PdfWriter() if concatenate else None
+    failed = 0
+    for index, pdf_bytes, errors in results:
+        if errors:
+            failed += 1
+            for err in errors:
+                print(f"Record {index}: {err}")
+        elif merged is not None:
+            merged.append(PdfReader(io.BytesIO(pdf_bytes)))
+
+    filled = len(jobs) - failed
+    if merged is not None and filled:
+        with open(output_path, "wb") as output:
+            merged.write(output)
+    elapsed = time.perf_counter() - start
+
+    page_count = len(_worker_state[0].pages) if _worker_state else len(PdfReader(input_pdf_path).pages)
+    total_pages = page_count * filled
+    print(f"Filled {filled} of {len(jobs)} records ({total_pages} pages) into {output_path} in {elapsed:.2f}s")
+    print(f"Throughput: {total_pages / elapsed if elapsed else 0:.1f} pages/s")
+    return failed == 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) in (6, 7) and sys.argv[1] == "--bulk":
+        workers = int(sys.argv[6]) if len(sys.argv) == 7 else os.cpu_count() or 1
+        try:
+            ok = fill_pdf_form_bulk(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5], workers)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        sys.exit(0 if ok else 1)
     if len(sys.argv) != 4:
         print("Usage: fill_pdf_form_with_annotations.py [input pdf] [fields.json] [output pdf]")
+        print("       fill_pdf_form_with_annotations.py --bulk [input pdf] [fields.json] [records.jsonl] [output dir | output pdf] [workers]")
         sys.exit(1)
     input_pdf = sys.argv[1]
     fields_json = sys.argv[2]
@@ -0,0 +1,218 @@
+"""
+Draft fields.json from the output of extract_form_structure.py.
+
+Each page's words, lines and checkboxes are loaded into NumPy arrays and:
+- Words are grouped into rows (similar `top`) and then into labels (words in a
+  row separated by less than a word gap)
+- Every label followed by enough empty space in its row gets an entry box
+  spanning that space, bounded below by the next horizontal line and by the
+  next row's labels
+- Every checkbox is paired with the label directly to its right, or failing
+  that to its left; each label is used once, and labels beside a checkbox
+  never get an entry box
+
+The draft is run through check_bounding_boxes.py before it is saved and any
+overlaps are reported.
+
+Output: a fields.json draft in PDF coordinates (`pdf_width`/`pdf_height`) with
+empty `entry_text`. Review it, fill in the text, drop fields that are not real
+entries, then run check_bounding_boxes.py.
+
+Usage: python infer_form_fields.py <form_structure.json> <fields.json>
+"""
+
+import json
+import sys
+
+import numpy as np
+
+from check_bounding_boxes import format_issue, get_bounding_box_issues
+
+ROW_TOLERANCE = 3.0
+WORD_GAP = 6.0
+ENTRY_GAP = 5.0
+MIN_ENTRY_WIDTH = 30.0
+CHECKBOX_LABEL_DISTANCE = 20.0
+PAGE_MARGIN = 36.0
+DEFAULT_FONT_SIZE = 10
+
+
+def _boxes(items, keys=("x0", "top", "x1", "bottom")):
+    if not items:
+        return np.zeros((0, 4))
+    return np.array([[item[k] for k in keys] for item in items], dtype=float)
+
+
+def group_labels(words):
+    # Returns label boxes (N x 4) and texts, grouped from word boxes in reading order.
+    boxes = _boxes(words)
+    if len(boxes) == 0:
+        return boxes, []
+
+    order = np.argsort(boxes[:, 1], kind="stable")
+    new_row = np.diff(boxes[order, 1], prepend=-np.inf) > ROW_TOLERANCE
+    row_ids = np.empty(len(boxes), dtype=int)
+    row_ids[order] = np.cumsum(new_row) - 1
+
+    order = np.lexsort((boxes[:, 0], row_ids))
+    sorted_boxes = boxes[order]
+    sorted_rows = row_ids[order]
+    gaps = sorted_boxes[:, 0] - np.roll(sorted_boxes[:, 2], 1)
+    new_label = np.ones(len(order), dtype=bool)
+    new_label[1:] = (sorted_rows[1:] != sorted_rows[:-1]) | (gaps[1:] > WORD_GAP)
+    label_ids = np.cumsum(new_label) - 1
+
+    count = label_ids[-1] + 1
+    labels = np.empty((count, 4))
+    labels[:, 0] = np.full(count, np.inf)
+    labels[:, 1] = np.full(count, np.inf)
+    labels[:, 2] = np.full(count, -np.inf)
+    labels[:, 3] = np.full(count, -np.inf)
+    np.minimum.at(labels[:, 0], label_ids, sorted_boxes[:, 0])
+    np.minimum.at(labels[:, 1], label_ids, sorted_boxes[:, 1])
+    np.maximum.at(labels[:, 2], label_ids, sorted_boxes[:, 2])
+    np.maximum.at(labels[:, 3], label_ids, sorted_boxes[:, 3])
+
+    texts = [[] for _ in range(count)]
+    for label_id, word_index in zip(label_ids, order):
+        texts[label_id].append(words[word_index]["text"])
+    return labels, [" ".join(t) for t in texts]
+
+
+def _same_row(a, b):
+    # Boolean matrix: rows of `a` whose vertical center falls within rows of `b`.
+    a_center = (a[:, 1] + a[:, 3]) / 2
+    return (a_center[:, None] >= b[None, :, 1] - ROW_TOLERANCE) & (a_center[:, None] <= b[None, :, 3] + ROW_TOLERANCE)
+
+
+def infer_page_fields(page, labels, texts, line_ys, checkboxes):
+    fields = []
+    page_number = page["page_number"]
+    right_limit = page["width"] - PAGE_MARGIN
+
+    checkbox_label = np.full(len(checkboxes), -1)
+    beside_checkbox = np.zeros(len(labels), dtype=bool)
+    if len(checkboxes) and len(labels):
+        same_row = _same_row(checkboxes, labels)
+        right = labels[None, :, 0] - checkboxes[:, None, 2]
+        left = checkboxes[:, None, 0] - labels[None, :, 2]
+        right = np.where(same_row & (right >= -ROW_TOLERANCE) & (right <= CHECKBOX_LABEL_DISTANCE), right, np.inf)
+        left = np.where(same_row & (left >= -ROW_TOLERANCE) & (left <= CHECKBOX_LABEL_DISTANCE), left, np.inf)
+        beside_checkbox = np.isfinite(right).any(axis=0) | np.isfinite(left).any(axis=0)
+
+        # Labels read to the right of their checkbox ("[ ] Yes"), so every right-hand
+        # pairing is taken before any left-hand one, closest first, each label once.
+        checkbox_index, label_index = np.nonzero(np.isfinite(right) | np.isfinite(left))
+        side = np.where(np.isfinite(right[checkbox_index, label_index]), 0, 1)
+        distance = np.minimum(right, left)[checkbox_index, label_index]
+        used_labels = set()
+        for k in np.lexsort((distance, side)):
+            cb, label = checkbox_index[k], label_index[k]
+            if checkbox_label[cb] < 0 and label not in used_labels:
+                checkbox_label[cb] = label
+                used_labels.add(label)
+
+    for i, label_index in enumerate(checkbox_label):
+        box = checkboxes[i]
+        if label_index >= 0:
+            label_box, text = labels[label_index], texts[label_index]
+        else:
+            # No label beside it: an empty label box at the checkbox's left edge.
+            label_box, text = [box[0], box[1], box[0], box[3]], f"Checkbox {i + 1}"
+        fields.append({
+            "page_number": page_number,
+            "description": f"{text} checkbox",
+            "field_label": text,
+            "label_bounding_box": [round(float(v), 1) for v in label_box],
+            "entry_bounding_box": [round(float(v), 1) for v in box],
+            "entry_text": {"text": "", "font_size": min(DEFAULT_FONT_SIZE, int(box[3] - box[1]))},
+        })
+
+    if len(labels) == 0:
+        return fields
+
+    # Everything that can end an entry box to the right of a label in the same row.
+    obstacles = np.vstack([labels, checkboxes]) if len(checkboxes) else labels
+    same_row = _same_row(labels, obstacles)
+    to_right = obstacles[None, :, 0] > labels[:, None, 2]
+    entry_x1 = np.where(same_row & to_right, obstacles[None, :, 0], right_limit + ENTRY_GAP).min(axis=1) - ENTRY_GAP
+    entry_x0 = labels[:, 2] + ENTRY_GAP
+
+    line_ys = np.sort(line_ys)
+    below = np.searchsorted(line_ys, labels[:, 3] - 1.0)
+    label_height = labels[:, 3] - labels[:, 1]
+    fallback_bottom = labels[:, 3] + np.maximum(label_height * 0.5, 2.0)
+    line_bottom = np.where(below < len(line_ys), line_ys[np.minimum(below, len(line_ys) - 1)], np.inf)
+    entry_bottom = np.where(line_bottom <= labels[:, 3] + 2 * label_height, line_bottom, fallback_bottom)
+
+    # Never reach into the next row, whose own entries start at its label tops.
+    below_label = obstacles[None, :, 1] >= labels[:, None, 3]
+    next_top = np.where(below_label, obstacles[None, :, 1], np.inf).min(axis=1)
+    entry_bottom = np.minimum(entry_bottom, next_top)
+
+    candidates = np.nonzero(((entry_x1 - entry_x0) >= MIN_ENTRY_WIDTH) & ~beside_checkbox)[0]
+
+    for i in candidates:
+        entry_box = [entry_x0[i], labels[i, 1], entry_x1[i], entry_bottom[i]]
+        height = entry_box[3] - entry_box[1]
+        fields.append({
+            "page_number": page_number,
+            "description": f"{texts[i]} entry field",
+            "field_label": texts[i],
+            "label_bounding_box": [round(float(v), 1) for v in labels[i]],
+            "entry_bounding_box": [round(float(v), 1) for v in entry_box],
+            "entry_text": {"text": "", "font_size": min(DEFAULT_FONT_SIZE, int(height))},
+        })
+
+    fields.sort(key=lambda f: (f["entry_bounding_box"][1], f["entry_bounding_box"][0]))
+    return fields
+
+
+def infer_form_fields(structure):
+    by_page = {p["page_number"]: {"labels": [], "lines": [], "checkboxes": []} for p in structure["pages"]}
+    for key in ("labels", "lines", "checkboxes"):
+        for item in structure[key]:
+            by_page[item["page"]][key].append(item)
+
+    result = {"pages": [], "form_fields": []}
+    for page in structure["pages"]:
+        items = by_page[page["page_number"]]
+        labels, texts = group_labels(items["labels"])
+        line_ys = np.array([line["y"] for line in items["lines"]], dtype=float)
+        checkboxes = _boxes(items["checkboxes"])
+
+        result["pages"].append({
+            "page_number": page["page_number"],
+            "pdf_width": page["width"],
+            "pdf_height": page["height"],
+        })
+        result["form_fields"].extend(infer_page_fields(page, labels, texts, line_ys, checkboxes))
+    return result
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: infer_form_fields.py <form_structure.json> <fields.json>")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        structure = json.load(f)
+
+    fields = infer_form_fields(structure)
+
+    with open(sys.argv[2], "w") as f:
+        json.dump(fields, f, indent=2)
+
+    print(f"Drafted {len(fields['form_fields'])} fields across {len(fields['pages'])} pages")
+
+    issues = get_bounding_box_issues(fields)
+    for issue in issues:
+        print(format_issue(issue))
+    if issues:
+        print(f"Saved to {sys.argv[2]}; fix the {len(issues)} bounding box issue(s) above, fill in entry_text, then run check_bounding_boxes.py")
+        sys.exit(1)
+    print(f"Saved to {sys.argv[2]}; bounding boxes pass check_bounding_boxes.py. Review it and fill in entry_text")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Add a new slide to an unpacked PPTX directory.
 
-Usage: python add_slide.py <unpacked_dir> <source>
+Usage:
+    python add_slide.py <unpacked_dir> <source>
+    python add_slide.py <unpacked_dir> --plan <plan.json>
 
 The source can be:
   - A slide file (e.g., slide2.xml) - duplicates the slide
@@ -16,8 +18,27 @@ Examples:
 To see available layouts: ls unpacked/ppt/slideLayouts/
 
 Prints the <p:sldId> element to add to presentation.xml.
+
+Batch mode applies a JSON plan of slide operations in one pass, reading and
+writing [Content_Types].xml, presentation.xml.rels and presentation.xml once,
+and updates <p:sldIdLst> automatically:
+
+    {"operations": [
+        {"op": "duplicate", "source": "slide2.xml"},
+        {"op": "layout", "source": "slideLayout2.xml", "after": "slide1.xml"},
+        {"op": "delete", "slide": "slide3.xml"},
+        {"op": "reorder", "order": ["slide1.xml", "slide6.xml", "slide2.xml"]}
+    ]}
+
+New slides are appended to the end of the deck unless "after" names a slide.
+"reorder" must list every slide currently in the deck. Deleted slides are
+only removed from <p:sldIdLst>; run clean.py afterwards to remove their files.
+The whole plan is validated before anything is written, so a failing
+operation leaves the unpacked deck unchanged.
 """
 
+import json
+import posixpath
 import re
 import shutil
 import sys
@@ -32,7 +53,6 @@ def get_next_slide_number(slides_dir: Path) -> int:
 
 def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
-    rels_dir = slides_dir / "_rels"
     layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
 
     layout_path = layouts_dir / layout_file
@@ -42,6 +62,44 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 
     next_num = get_next_slide_number(slides_dir)
     dest = f"slide{next_num}.xml"
+
+    _write_slide_from_layout(slides_dir, dest, layout_file)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {layout_file}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def duplicate_slide(unpacked_dir: Path, source: str) -> None:
+    slides_dir = unpacked_dir / "ppt" / "slides"
+    source_slide = slides_dir / source
+
+    if not source_slide.exists():
+        print(f"Error: {source_slide} not found", file=sys.stderr)
+        sys.exit(1)
+
+    next_num = get_next_slide_number(slides_dir)
+    dest = f"slide{next_num}.xml"
+
+    _copy_slide(slides_dir, source, dest)
+
+    _add_to_content_types(unpacked_dir, dest)
+
+    rid = _add_to_presentation_rels(unpacked_dir, dest)
+
+    next_slide_id = _get_next_slide_id(unpacked_dir)
+
+    print(f"Created {dest} from {source}")
+    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
+
+
+def _write_slide_from_layout(slides_dir: Path, dest: str, layout_file: str) -> None:
+    rels_dir = slides_dir / "_rels"
     dest_slide = slides_dir / dest
     dest_rels = rels_dir / f"{dest}.rels"
 
@@ -77,34 +135,13 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 </Relationships>'''
     dest_rels.write_text(rels_xml, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
-
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-
-    next_slide_id = _get_next_slide_id(unpacked_dir)
-
-    print(f"Created {dest} from {layout_file}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
-
 
-def duplicate_slide(unpacked_dir: Path, source: str) -> None:
-    slides_dir = unpacked_dir / "ppt" / "slides"
+def _copy_slide(slides_dir: Path, source: str, dest: str) -> None:
     rels_dir = slides_dir / "_rels"
-
-    source_slide = slides_dir / source
-
-    if not source_slide.exists():
-        print(f"Error: {source_slide} not found", file=sys.stderr)
-        sys.exit(1)
-
-    next_num = get_next_slide_number(slides_dir)
-    dest = f"slide{next_num}.xml"
-    dest_slide = slides_dir / dest
-
     source_rels = rels_dir / f"{source}.rels"
     dest_rels = rels_dir / f"{dest}.rels"
 
-    shutil.copy2(source_slide, dest_slide)
+    shutil.copy2(slides_dir / source, slides_dir / dest)
 
     if source_rels.exists():
         shutil.copy2(source_rels, dest_rels)
@@ -117,15 +154,6 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
         )
         dest_rels.write_text(rels_content, encoding="utf-8")
 
-    _add_to_content_types(unpacked_dir, dest)
-
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
-
-    next_slide_id = _get_next_slide_id(unpacked_dir)
-
-    print(f"Created {dest} from {source}")
-    print(f'Add to presentation.xml <p:sldIdLst>: <p:sldId id="{next_slide_id}" r:id="{rid}"/>')
-
 
 def _add_to_content_types(unpacked_dir: Path, dest: str) -> None:
     content_types_path = unpacked_dir / "[Content_Types].xml"
@@ -162,6 +190,217 @@ def _get_next_slide_id(unpacked_dir: Path) -> int:
     return max(slide_ids) + 1 if slide_ids else 256
 
 
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+_SLD_ID_RE = re.compile(r"<p:sldId\b[^>]*?(?:/>|>.*?</p:sldId>)", re.DOTALL)
+_SLD_ID_LST_RE = re.compile(r"<p:sldIdLst\s*/>|<p:sldIdLst>.*?</p:sldIdLst>", re.DOTALL)
+
+
+def _resolve_slide_target(target: str) -> str:
+    # Same resolution as clean.py's relationship graph: absolute targets are
+    # package paths, relative ones are relative to ppt/ (presentation.xml's folder)
+    target = target.split("#", 1)[0]
+    if target.startswith("/"):
+        target_path = posixpath.normpath(target.lstrip("/"))
+    else:
+        target_path = posixpath.normpath(posixpath.join("ppt", target))
+    slide_dir, slide_name = posixpath.split(target_path)
+    if slide_dir != "ppt/slides" or not slide_name:
+        raise ValueError(f"slide relationship target {target!r} is not in ppt/slides/")
+    return slide_name
+
+
+class SlideBatch:
+    """Apply many slide operations to an unpacked PPTX with one write per shared part."""
+
+    def __init__(self, unpacked_dir: Path):
+        self.unpacked_dir = unpacked_dir
+        self.slides_dir = unpacked_dir / "ppt" / "slides"
+        self.layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
+        self.content_types_path = unpacked_dir / "[Content_Types].xml"
+        self.pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+        self.pres_path = unpacked_dir / "ppt" / "presentation.xml"
+
+        self.content_types = self.content_types_path.read_text(encoding="utf-8")
+        self.pres_rels = self.pres_rels_path.read_text(encoding="utf-8")
+        self.pres = self.pres_path.read_text(encoding="utf-8")
+
+        self.next_slide_num = get_next_slide_number(self.slides_dir)
+        rids = [int(m) for m in re.findall(r'Id="rId(\d+)"', self.pres_rels)]
+        self.next_rid = max(rids) + 1 if rids else 1
+        slide_ids = [int(m) for m in re.findall(r'<p:sldId[^>]*id="(\d+)"', self.pres)]
+        self.next_slide_id = max(slide_ids) + 1 if slide_ids else 256
+
+        self.slide_to_rid = {}
+        for rel in re.findall(r"<Relationship\b[^>]*>", self.pres_rels):
+            rid = re.search(r'\bId="([^"]+)"', rel)
+            rel_type = re.search(r'\bType="([^"]+)"', rel)
+            target = re.search(r'\bTarget="([^"]+)"', rel)
+            if rid and target and rel_type and rel_type.group(1) == SLIDE_REL_TYPE:
+                self.slide_to_rid[_resolve_slide_target(target.group(1))] = rid.group(1)
+        rid_to_slide = {rid: name for name, rid in self.slide_to_rid.items()}
+
+        sld_id_lst = _SLD_ID_LST_RE.search(self.pres)
+        self.order = []
+        for entry in _SLD_ID_RE.findall(sld_id_lst.group(0) if sld_id_lst else ""):
+            rid = re.search(r'r:id="([^"]+)"', entry)
+            if not rid or rid.group(1) not in rid_to_slide:
+                raise ValueError(f"<p:sldIdLst> entry {entry} has no slide relationship in presentation.xml.rels")
+            self.order.append((rid_to_slide[rid.group(1)], entry))
+
+        self.new_content_types = []
+        self.new_rels = []
+        # Slide files are only written by save(), so a plan that fails part-way
+        # leaves the unpacked deck untouched
+        self.pending_writes = []
+        self.pending_slides = set()
+
+    def slides(self) -> list[str]:
+        return [name for name, _ in self.order]
+
+    def duplicate(self, source: str, after: str | None = None) -> str:
+        if source not in self.pending_slides and not (self.slides_dir / source).exists():
+            raise ValueError(f"{self.slides_dir / source} not found")
+        dest = self._reserve_slide_name()
+        self._register(dest, after)
+        self.pending_writes.append(lambda: _copy_slide(self.slides_dir, source, dest))
+        self.pending_slides.add(dest)
+        return dest
+
+    def add_from_layout(self, layout_file: str, after: str | None = None) -> str:
+        if not (self.layouts_dir / layout_file).exists():
+            raise ValueError(f"{self.layouts_dir / layout_file} not found")
+        dest = self._reserve_slide_name()
+        self._register(dest, after)
+        self.pending_writes.append(lambda: _write_slide_from_layout(self.slides_dir, dest, layout_file))
+        self.pending_slides.add(dest)
+        return dest
+
+    def delete(self, slide: str) -> None:
+        if slide not in self.slides():
+            raise ValueError(f"{slide} is not in <p:sldIdLst>")
+        self.order = [(name, entry) for name, entry in self.order if name != slide]
+
+    def reorder(self, order: list[str]) -> None:
+        entries = dict(self.order)
+        if sorted(order) != sorted(entries):
+            missing = sorted(set(entries) - set(order))
+            unknown = sorted(set(order) - set(entries))
+            raise ValueError(
+                f"reorder must list every slide exactly once "
+                f"(missing: {missing}, unknown: {unknown})"
+            )
+        self.order = [(name, entries[name]) for name in order]
+
+    def save(self) -> None:
+        pres = self._render_pres()
+
+        for write in self.pending_writes:
+            write()
+
+        if self.new_content_types:
+            overrides = "".join(f"  {o}\n" for o in self.new_content_types)
+            self.content_types = self.content_types.replace("</Types>", f"{overrides}</Types>")
+            self.content_types_path.write_text(self.content_types, encoding="utf-8")
+
+        if self.new_rels:
+            rels = "".join(f"  {r}\n" for r in self.new_rels)
+            self.pres_rels = self.pres_rels.replace("</Relationships>", f"{rels}</Relationships>")
+            self.pres_rels_path.write_text(self.pres_rels, encoding="utf-8")
+
+        self.pres_path.write_text(pres, encoding="utf-8")
+
+    def _reserve_slide_name(self) -> str:
+        dest = f"slide{self.next_slide_num}.xml"
+        self.next_slide_num += 1
+        return dest
+
+    def _register(self, dest: str, after: str | None) -> None:
+        names = self.slides()
+        if after is not None and after not in names:
+            raise ValueError(f"{after} is not in <p:sldIdLst>")
+
+        if f"/ppt/slides/{dest}" not in self.content_types:
+            self.new_content_types.append(
+                f'<Override PartName="/ppt/slides/{dest}" ContentType="{SLIDE_CONTENT_TYPE}"/>'
+            )
+
+        rid = f"rId{self.next_rid}"
+        self.next_rid += 1
+        self.new_rels.append(
+            f'<Relationship Id="{rid}" Type="{SLIDE_REL_TYPE}" Target="slides/{dest}"/>'
+        )
+        self.slide_to_rid[dest] = rid
+
+        entry = f'<p:sldId id="{self.next_slide_id}" r:id="{rid}"/>'
+        self.next_slide_id += 1
+
+        if after is None:
+            self.order.append((dest, entry))
+        else:
+            self.order.insert(names.index(after) + 1, (dest, entry))
+
+    def _render_pres(self) -> str:
+        match = _SLD_ID_LST_RE.search(self.pres)
+        anchor = match.start() if match else self.pres.find("<p:sldSz")
+        if anchor == -1:
+            raise ValueError("presentation.xml has no <p:sldIdLst> or <p:sldSz> element")
+
+        # Follow the file's layout: indented entries when the list starts its own
+        # line, everything inline for single-line (unformatted) XML
+        line_start = self.pres.rfind("\n", 0, anchor) + 1
+        prefix = self.pres[line_start:anchor]
+        pretty = not prefix.strip()
+        indent = re.match(r"[ \t]*", prefix).group(0)
+
+        if not self.order:
+            sld_id_lst = "<p:sldIdLst/>"
+        elif pretty:
+            entries = "".join(f"{indent}  {entry}\n" for _, entry in self.order)
+            sld_id_lst = f"<p:sldIdLst>\n{entries}{indent}</p:sldIdLst>"
+        else:
+            entries = "".join(entry for _, entry in self.order)
+            sld_id_lst = f"<p:sldIdLst>{entries}</p:sldIdLst>"
+
+        if match:
+            return self.pres[:match.start()] + sld_id_lst + self.pres[match.end():]
+
+        separator = f"\n{indent}" if pretty else ""
+        return self.pres[:anchor] + sld_id_lst + separator + self.pres[anchor:]
+
+
+def apply_plan(unpacked_dir: Path, operations: list[dict]) -> list[str]:
+    batch = SlideBatch(unpacked_dir)
+    messages = []
+
+    for i, op in enumerate(operations, 1):
+        kind = op.get("op")
+        try:
+            if kind == "duplicate":
+                dest = batch.duplicate(op["source"], op.get("after"))
+                messages.append(f"Created {dest} from {op['source']}")
+            elif kind == "layout":
+                dest = batch.add_from_layout(op["source"], op.get("after"))
+                messages.append(f"Created {dest} from {op['source']}")
+            elif kind == "delete":
+                batch.delete(op["slide"])
+                messages.append(f"Removed {op['slide']} from <p:sldIdLst>")
+            elif kind == "reorder":
+                batch.reorder(op["order"])
+                messages.append(f"Reordered {len(op['order'])} slides")
+            else:
+                raise ValueError(f"unknown op {kind!r}")
+        except KeyError as e:
+            raise ValueError(f"operation {i} ({kind}): missing field {e}") from None
+        except ValueError as e:
+            raise ValueError(f"operation {i} ({kind}): {e}") from None
+
+    batch.save()
+    messages.append(f"Deck order: {', '.join(batch.slides())}")
+    return messages
+
+
 def parse_source(source: str) -> tuple[str, str | None]:
     if source.startswith("slideLayout") and source.endswith(".xml"):
         return ("layout", source)
@@ -170,14 +409,50 @@ def parse_source(source: str) -> tuple[str, str | None]:
 
 
 if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[2] == "--plan":
+        unpacked_dir = Path(sys.argv[1])
+        if not unpacked_dir.exists():
+            print(f"Error: {unpacked_dir} not found", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            plan = json.loads(Path(sys.argv[3]).read_text(encoding="utf-8"))
+            operations = plan["operations"] if isinstance(plan, dict) else plan
+            if not isinstance(operations, list) or not all(isinstance(op, dict) for op in operations):
+                raise TypeError("operations must be a list of objects")
+        except OSError as e:
+            print(f"Error: cannot read plan: {e}", file=sys.stderr)
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(f"Error: invalid plan JSON: {e}", file=sys.stderr)
+            sys.exit(1)
+        except KeyError:
+            print('Error: plan has no "operations" list', file=sys.stderr)
+            sys.exit(1)
+        except TypeError as e:
+            print(f"Error: invalid plan: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        try:
+            messages = apply_plan(unpacked_dir, operations)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        for message in messages:
+            print(message)
+        sys.exit(0)
+
     if len(sys.argv) != 3:
         print("Usage: python add_slide.py <unpacked_dir> <source>", file=sys.stderr)
+        print("       python add_slide.py <unpacked_dir> --plan <plan.json>", file=sys.stderr)
         print("", file=sys.stderr)
         print("Source can be:", file=sys.stderr)
         print("  slide2.xml        - duplicate an existing slide", file=sys.stderr)
         print("  slideLayout2.xml  - create from a layout template", file=sys.stderr)
         print("", file=sys.stderr)
         print("To see available layouts: ls <unpacked_dir>/ppt/slideLayouts/", file=sys.stderr)
+        print("See the module docstring for the --plan JSON format.", file=sys.stderr)
         sys.exit(1)
 
     unpacked_dir = Path(sys.argv[1])
@@ -1,11 +1,15 @@
 """Remove unreferenced files from an unpacked PPTX directory.
 
-Usage: python clean.py <unpacked_dir>
+Usage: python clean.py <unpacked_dir> [--dry-run]
 
 Example:
     python clean.py unpacked/
+    python clean.py unpacked/ --dry-run
 
-This script removes:
+Every .rels file is parsed once to build the relationship graph. Parts
+reachable from the package root (_rels/.rels) are marked, treating slides
+missing from <p:sldIdLst> as unreferenced, and everything else is deleted in
+a single sweep. This removes:
 - Orphaned slides (not in sldIdLst) and their relationships
 - [trash] directory (unreferenced files)
 - Orphaned .rels files for deleted resources
@@ -15,15 +19,16 @@ This script removes:
 - Content-Type overrides for deleted files
 """
 
+import argparse
+import posixpath
+import re
 import sys
+import time
 from pathlib import Path
 
 import defusedxml.minidom
 
 
-import re
-
-
 def get_slides_in_sldidlst(unpacked_dir: Path) -> set[str]:
     pres_path = unpacked_dir / "ppt" / "presentation.xml"
     pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
@@ -46,176 +51,100 @@ def get_slides_in_sldidlst(unpacked_dir: Path) -> set[str]:
     return {rid_to_slide[rid] for rid in referenced_rids if rid in rid_to_slide}
 
 
-def remove_orphaned_slides(unpacked_dir: Path) -> list[str]:
-    slides_dir = unpacked_dir / "ppt" / "slides"
-    slides_rels_dir = slides_dir / "_rels"
-    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-
-    if not slides_dir.exists():
-        return []
-
-    referenced_slides = get_slides_in_sldidlst(unpacked_dir)
-    removed = []
-
-    for slide_file in slides_dir.glob("slide*.xml"):
-        if slide_file.name not in referenced_slides:
-            rel_path = slide_file.relative_to(unpacked_dir)
-            slide_file.unlink()
-            removed.append(str(rel_path))
-
-            rels_file = slides_rels_dir / f"{slide_file.name}.rels"
-            if rels_file.exists():
-                rels_file.unlink()
-                removed.append(str(rels_file.relative_to(unpacked_dir)))
-
-    if removed and pres_rels_path.exists():
-        rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
-        changed = False
-
-        for rel in list(rels_dom.getElementsByTagName("Relationship")):
-            target = rel.getAttribute("Target")
-            if target.startswith("slides/"):
-                slide_name = target.replace("slides/", "")
-                if slide_name not in referenced_slides:
-                    if rel.parentNode:
-                        rel.parentNode.removeChild(rel)
-                        changed = True
-
-        if changed:
-            with open(pres_rels_path, "wb") as f:
-                f.write(rels_dom.toxml(encoding="utf-8"))
-
-    return removed
-
-
-def remove_trash_directory(unpacked_dir: Path) -> list[str]:
-    trash_dir = unpacked_dir / "[trash]"
-    removed = []
+def build_relationship_graph(unpacked_dir: Path) -> dict[str, list[tuple[str, str]]]:
+    graph = {}
 
-    if trash_dir.exists() and trash_dir.is_dir():
-        for file_path in trash_dir.iterdir():
-            if file_path.is_file():
-                rel_path = file_path.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
-                file_path.unlink()
-        trash_dir.rmdir()
-
-    return removed
-
-
-def get_slide_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
-    slides_rels_dir = unpacked_dir / "ppt" / "slides" / "_rels"
-
-    if not slides_rels_dir.exists():
-        return referenced
+    for rels_file in unpacked_dir.rglob("*.rels"):
+        rels_rel = rels_file.relative_to(unpacked_dir).as_posix()
+        source = _rels_source(rels_rel)
+        base_dir = posixpath.dirname(source) if source else ""
 
-    for rels_file in slides_rels_dir.glob("*.rels"):
         dom = defusedxml.minidom.parse(str(rels_file))
+        edges = []
         for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
+            target = rel.getAttribute("Target").split("#", 1)[0]
+            if not target or rel.getAttribute("TargetMode") == "External":
                 continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
+            if target.startswith("/"):
+                target_path = posixpath.normpath(target.lstrip("/"))
+            else:
+                target_path = posixpath.normpath(posixpath.join(base_dir, target))
+            edges.append((target_path, rel.getAttribute("Type")))
+        graph[source] = edges
+
+    return graph
+
+
+def mark_reachable(
+    graph: dict[str, list[tuple[str, str]]], referenced_slides: set[str]
+) -> set[str]:
+    reachable = {""}
+    stack = [""]
+
+    while stack:
+        source = stack.pop()
+        for target, rel_type in graph.get(source, []):
+            if target in reachable:
+                continue
+            if (
+                source == "ppt/presentation.xml"
+                and rel_type.endswith("/slide")
+                and posixpath.basename(target) not in referenced_slides
+            ):
+                continue
+            reachable.add(target)
+            stack.append(target)
 
-    return referenced
+    return reachable
 
 
-def remove_orphaned_rels_files(unpacked_dir: Path) -> list[str]:
-    resource_dirs = ["charts", "diagrams", "drawings"]
-    removed = []
-    slide_referenced = get_slide_referenced_files(unpacked_dir)
+def find_unreachable_files(unpacked_dir: Path, reachable: set[str]) -> list[str]:
+    unreachable = []
 
-    for dir_name in resource_dirs:
-        rels_dir = unpacked_dir / "ppt" / dir_name / "_rels"
-        if not rels_dir.exists():
+    for file_path in unpacked_dir.rglob("*"):
+        if not file_path.is_file():
             continue
-
-        for rels_file in rels_dir.glob("*.rels"):
-            resource_file = rels_dir.parent / rels_file.name.replace(".rels", "")
-            try:
-                resource_rel_path = resource_file.resolve().relative_to(unpacked_dir.resolve())
-            except ValueError:
+        rel_path = file_path.relative_to(unpacked_dir).as_posix()
+        if rel_path == "[Content_Types].xml":
+            continue
+        if rel_path.endswith(".rels"):
+            source = _rels_source(rel_path)
+            if source == "" or source in reachable:
                 continue
+        elif rel_path in reachable:
+            continue
+        unreachable.append(rel_path)
 
-            if not resource_file.exists() or resource_rel_path not in slide_referenced:
-                rels_file.unlink()
-                rel_path = rels_file.relative_to(unpacked_dir)
-                removed.append(str(rel_path))
-
-    return removed
-
-
-def get_referenced_files(unpacked_dir: Path) -> set:
-    referenced = set()
+    return sorted(unreachable)
 
-    for rels_file in unpacked_dir.rglob("*.rels"):
-        dom = defusedxml.minidom.parse(str(rels_file))
-        for rel in dom.getElementsByTagName("Relationship"):
-            target = rel.getAttribute("Target")
-            if not target:
-                continue
-            target_path = (rels_file.parent.parent / target).resolve()
-            try:
-                referenced.add(target_path.relative_to(unpacked_dir.resolve()))
-            except ValueError:
-                pass
 
-    return referenced
+def remove_slide_relationships(unpacked_dir: Path, referenced_slides: set[str]) -> None:
+    pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
+    if not pres_rels_path.exists():
+        return
 
+    rels_dom = defusedxml.minidom.parse(str(pres_rels_path))
+    changed = False
 
-def remove_orphaned_files(unpacked_dir: Path, referenced: set) -> list[str]:
-    resource_dirs = ["media", "embeddings", "charts", "diagrams", "tags", "drawings", "ink"]
-    removed = []
+    for rel in list(rels_dom.getElementsByTagName("Relationship")):
+        target = rel.getAttribute("Target")
+        if target.startswith("slides/"):
+            slide_name = target.replace("slides/", "")
+            if slide_name not in referenced_slides:
+                if rel.parentNode:
+                    rel.parentNode.removeChild(rel)
+                    changed = True
 
-    for dir_name in resource_dirs:
-        dir_path = unpacked_dir / "ppt" / dir_name
-        if not dir_path.exists():
-            continue
+    if changed:
+        with open(pres_rels_path, "wb") as f:
+            f.write(rels_dom.toxml(encoding="utf-8"))
 
-        for file_path in dir_path.glob("*"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-    theme_dir = unpacked_dir / "ppt" / "theme"
-    if theme_dir.exists():
-        for file_path in theme_dir.glob("theme*.xml"):
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-                theme_rels = theme_dir / "_rels" / f"{file_path.name}.rels"
-                if theme_rels.exists():
-                    theme_rels.unlink()
-                    removed.append(str(theme_rels.relative_to(unpacked_dir)))
-
-    notes_dir = unpacked_dir / "ppt" / "notesSlides"
-    if notes_dir.exists():
-        for file_path in notes_dir.glob("*.xml"):
-            if not file_path.is_file():
-                continue
-            rel_path = file_path.relative_to(unpacked_dir)
-            if rel_path not in referenced:
-                file_path.unlink()
-                removed.append(str(rel_path))
-
-        notes_rels_dir = notes_dir / "_rels"
-        if notes_rels_dir.exists():
-            for file_path in notes_rels_dir.glob("*.rels"):
-                notes_file = notes_dir / file_path.name.replace(".rels", "")
-                if not notes_file.exists():
-                    file_path.unlink()
-                    removed.append(str(file_path.relative_to(unpacked_dir)))
 
-    return removed
+def _rels_source(rels_rel_path: str) -> str:
+    rels_dir, rels_name = posixpath.split(rels_rel_path)
+    source_dir = posixpath.dirname(rels_dir)
+    source_name = rels_name[: -len(".rels")]
+    return posixpath.join(source_dir, source_name) if source_name else ""
 
 
 def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
@@ -238,49 +167,78 @@ def update_content_types(unpacked_dir: Path, removed_files: list[str]) -> None:
             f.write(dom.toxml(encoding="utf-8"))
 
 
-def clean_unused_files(unpacked_dir: Path) -> list[str]:
-    all_removed = []
+def clean_unused_files(
+    unpacked_dir: Path, dry_run: bool = False, timings: dict | None = None
+) -> list[str]:
+    if not (unpacked_dir / "_rels" / ".rels").exists():
+        raise FileNotFoundError(f"{unpacked_dir / '_rels' / '.rels'} not found")
+
+    timings = timings if timings is not None else {}
 
-    slides_removed = remove_orphaned_slides(unpacked_dir)
-    all_removed.extend(slides_removed)
+    start = time.perf_counter()
+    referenced_slides = get_slides_in_sldidlst(unpacked_dir)
+    graph = build_relationship_graph(unpacked_dir)
+    timings["graph"] = time.perf_counter() - start
 
-    trash_removed = remove_trash_directory(unpacked_dir)
-    all_removed.extend(trash_removed)
+    start = time.perf_counter()
+    reachable = mark_reachable(graph, referenced_slides)
+    timings["mark"] = time.perf_counter() - start
 
-    while True:
-        removed_rels = remove_orphaned_rels_files(unpacked_dir)
-        referenced = get_referenced_files(unpacked_dir)
-        removed_files = remove_orphaned_files(unpacked_dir, referenced)
+    start = time.perf_counter()
+    removed = find_unreachable_files(unpacked_dir, reachable)
 
-        total_removed = removed_rels + removed_files
-        if not total_removed:
-            break
+    if removed and not dry_run:
+        for rel_path in removed:
+            (unpacked_dir / rel_path).unlink()
 
-        all_removed.extend(total_removed)
+        trash_dir = unpacked_dir / "[trash]"
+        if trash_dir.is_dir() and not any(trash_dir.iterdir()):
+            trash_dir.rmdir()
 
-    if all_removed:
-        update_content_types(unpacked_dir, all_removed)
+        remove_slide_relationships(unpacked_dir, referenced_slides)
+        update_content_types(unpacked_dir, removed)
+    timings["sweep"] = time.perf_counter() - start
 
-    return all_removed
+    timings["parts"] = len(reachable) - 1
+    timings["rels"] = len(graph)
+    return removed
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python clean.py <unpacked_dir>", file=sys.stderr)
-        print("Example: python clean.py unpacked/", file=sys.stderr)
-        sys.exit(1)
-
-    unpacked_dir = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        description="Remove unreferenced files from an unpacked PPTX directory."
+    )
+    parser.add_argument("unpacked_dir", help="Unpacked PPTX directory")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report unreferenced files without deleting anything",
+    )
+    args = parser.parse_args()
+
+    unpacked_dir = Path(args.unpacked_dir)
 
     if not unpacked_dir.exists():
         print(f"Error: {unpacked_dir} not found", file=sys.stderr)
         sys.exit(1)
 
-    removed = clean_unused_files(unpacked_dir)
+    timings = {}
+    try:
+        removed = clean_unused_files(unpacked_dir, dry_run=args.dry_run, timings=timings)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
     if removed:
-        print(f"Removed {len(removed)} unreferenced files:")
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {len(removed)} unreferenced files:")
         for f in removed:
             print(f"  {f}")
     else:
         print("No unreferenced files found")
+
+    print(
+        f"Scanned {timings['rels']} .rels files, {timings['parts']} reachable parts "
+        f"(graph {timings['graph'] * 1000:.1f} ms, mark {timings['mark'] * 1000:.1f} ms, "
+        f"sweep {timings['sweep'] * 1000:.1f} ms)"
+    )
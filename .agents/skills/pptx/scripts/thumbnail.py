@@ -4,8 +4,29 @@ Creates a grid layout of slide thumbnails for quick visual analysis.
 Labels each thumbnail with its XML filename (e.g., slide1.xml).
 Hidden slides are shown with a placeholder pattern.
 
+Rendered slide images are cached by a hash of each slide's parts (slide XML,
+layout, master, theme, media) and its position in the deck, so re-running on
+an unchanged deck skips the soffice conversion entirely, while moved slides
+are re-rendered with their new slide numbers.
+
+Pages are rasterized in-process at thumbnail width: with pypdfium2 when it is
+installed, otherwise from a pdftoppm PPM stream piped through stdin/stdout.
+
+With --changed-since, only slides whose images are not cached are rendered,
+from a temporary copy of the deck whose <p:sldIdLst> lists just those slides.
+The grid is then rebuilt from cached images. The manifest records each
+slide's hash and is rewritten after every run. Slide-number fields on
+re-rendered slides show their position in the temporary deck, so these images
+are cached separately and never reused by a full run.
+
+After each run, cached images unused for 30 days are removed and the least
+recently used ones are evicted until the cache is under 200 MB. --clear-cache
+empties it.
+
 Usage:
-    python thumbnail.py input.pptx [output_prefix] [--cols N]
+    python thumbnail.py input.pptx [output_prefix] [--cols N] [--no-cache]
+                        [--changed-since MANIFEST]
+    python thumbnail.py --clear-cache
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -13,21 +34,34 @@ Examples:
 
     python thumbnail.py template.pptx grid --cols 4
     # Creates: grid.jpg (or grid-1.jpg, grid-2.jpg for large decks)
+
+    python thumbnail.py deck.pptx --changed-since thumbnails.json
+    # Re-renders only slides edited since the last run
 """
 
 import argparse
+import hashlib
+import json
+import posixpath
+import re
 import subprocess
 import sys
 import tempfile
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import defusedxml.minidom
 from office.soffice import get_soffice_env
 from PIL import Image, ImageDraw, ImageFont
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
 THUMBNAIL_WIDTH = 300
-CONVERSION_DPI = 100
 MAX_COLS = 6
 DEFAULT_COLS = 3
 JPEG_QUALITY = 95
@@ -35,13 +69,19 @@ GRID_PADDING = 20
 BORDER_WIDTH = 2
 FONT_SIZE_RATIO = 0.10
 LABEL_PADDING_RATIO = 0.4
+CACHE_DIR = Path(tempfile.gettempdir()) / "pptx_thumbnail_cache"
+CACHE_MAX_AGE_DAYS = 30
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+SKIPPED_REL_TYPES = ("/slide", "/notesSlide")
+PPM_HEADER_PATTERN = re.compile(rb"P6\s+(\d+)\s+(\d+)\s+(\d+)\s")
+SLD_ID_PATTERN = re.compile(r"<p:sldId\b[^>]*?(?:/>|>.*?</p:sldId>)", re.DOTALL)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Create thumbnail grids from PowerPoint slides."
     )
-    parser.add_argument("input", help="Input PowerPoint file (.pptx)")
+    parser.add_argument("input", nargs="?", help="Input PowerPoint file (.pptx)")
     parser.add_argument(
         "output_prefix",
         nargs="?",
@@ -54,9 +94,31 @@ def main():
         default=DEFAULT_COLS,
         help=f"Number of columns (default: {DEFAULT_COLS}, max: {MAX_COLS})",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always re-render slides instead of reusing images from {CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help=f"Delete every cached slide image in {CACHE_DIR} and exit",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="MANIFEST",
+        help="Render only changed slides, using and updating this JSON manifest",
+    )
 
     args = parser.parse_args()
 
+    if args.clear_cache:
+        removed = clear_cache(CACHE_DIR)
+        print(f"Removed {removed} cached slide image(s) from {CACHE_DIR}")
+        sys.exit(0)
+    if args.input is None:
+        parser.error("the following arguments are required: input")
+
     cols = min(args.cols, MAX_COLS)
     if args.cols > MAX_COLS:
         print(f"Warning: Columns limited to {MAX_COLS}")
@@ -66,20 +128,28 @@ def main():
         print(f"Error: Invalid PowerPoint file: {args.input}", file=sys.stderr)
         sys.exit(1)
 
+    if args.changed_since and args.no_cache:
+        print("Error: --changed-since requires the slide cache", file=sys.stderr)
+        sys.exit(1)
+
     output_path = Path(f"{args.output_prefix}.jpg")
+    manifest_path = Path(args.changed_since) if args.changed_since else None
 
     try:
         slide_info = get_slide_info(input_path)
 
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            visible_images = convert_to_images(input_path, temp_path)
+            cache_dir = None if args.no_cache else CACHE_DIR
+            visible_images = get_visible_images(
+                input_path, slide_info, temp_path, cache_dir, manifest_path
+            )
 
             if not visible_images and not any(s["hidden"] for s in slide_info):
                 print("Error: No slides found", file=sys.stderr)
                 sys.exit(1)
 
-            slides = build_slide_list(slide_info, visible_images, temp_path)
+            slides = build_slide_list(slide_info, visible_images)
 
             grid_files = create_grids(slides, cols, THUMBNAIL_WIDTH, output_path)
 
@@ -94,16 +164,7 @@ def main():
 
 def get_slide_info(pptx_path: Path) -> list[dict]:
     with zipfile.ZipFile(pptx_path, "r") as zf:
-        rels_content = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
-        rels_dom = defusedxml.minidom.parseString(rels_content)
-
-        rid_to_slide = {}
-        for rel in rels_dom.getElementsByTagName("Relationship"):
-            rid = rel.getAttribute("Id")
-            target = rel.getAttribute("Target")
-            rel_type = rel.getAttribute("Type")
-            if "slide" in rel_type and target.startswith("slides/"):
-                rid_to_slide[rid] = target.replace("slides/", "")
+        rid_to_slide = _get_rid_to_slide(zf)
 
         pres_content = zf.read("ppt/presentation.xml").decode("utf-8")
         pres_dom = defusedxml.minidom.parseString(pres_content)
@@ -118,14 +179,248 @@ def get_slide_info(pptx_path: Path) -> list[dict]:
         return slides
 
 
-def build_slide_list(
+def _get_rid_to_slide(zf: zipfile.ZipFile) -> dict[str, str]:
+    rels_content = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
+    rels_dom = defusedxml.minidom.parseString(rels_content)
+
+    rid_to_slide = {}
+    for rel in rels_dom.getElementsByTagName("Relationship"):
+        rid = rel.getAttribute("Id")
+        target = rel.getAttribute("Target")
+        rel_type = rel.getAttribute("Type")
+        if "slide" in rel_type and target.startswith("slides/"):
+            rid_to_slide[rid] = target.replace("slides/", "")
+
+    return rid_to_slide
+
+
+def get_slide_hashes(
+    pptx_path: Path, slide_names: list[str], positions: list[int]
+) -> list[str]:
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        names = set(zf.namelist())
+        part_digests = {}
+        part_targets = {}
+
+        def digest(part: str) -> str:
+            if part not in part_digests:
+                part_digests[part] = hashlib.sha256(zf.read(part)).hexdigest()
+            return part_digests[part]
+
+        def targets(part: str) -> list[str]:
+            if part not in part_targets:
+                part_targets[part] = _get_rendered_targets(zf, names, part)
+            return part_targets[part]
+
+        pres_content = zf.read("ppt/presentation.xml").decode("utf-8")
+        sld_sz = re.search(r"<p:sldSz\b[^>]*>", pres_content)
+        base = f"{THUMBNAIL_WIDTH}|{sld_sz.group(0) if sld_sz else ''}"
+
+        hashes = []
+        for slide_name, position in zip(slide_names, positions):
+            start = f"ppt/slides/{slide_name}"
+            closure = {start}
+            stack = [start]
+            while stack:
+                for target in targets(stack.pop()):
+                    if target not in closure:
+                        closure.add(target)
+                        stack.append(target)
+
+            # Slide-number fields render the slide's place in <p:sldIdLst>
+            h = hashlib.sha256(f"{base}|{position}".encode("utf-8"))
+            for part in sorted(closure):
+                h.update(f"{part}:{digest(part)}\n".encode("utf-8"))
+            hashes.append(h.hexdigest())
+
+        return hashes
+
+
+def _get_rendered_targets(zf: zipfile.ZipFile, names: set[str], part: str) -> list[str]:
+    part_dir, part_name = posixpath.split(part)
+    rels_path = posixpath.join(part_dir, "_rels", f"{part_name}.rels")
+    if rels_path not in names:
+        return []
+
+    rels_dom = defusedxml.minidom.parseString(zf.read(rels_path))
+    targets = []
+    for rel in rels_dom.getElementsByTagName("Relationship"):
+        target = rel.getAttribute("Target")
+        if (
+            not target
+            or rel.getAttribute("TargetMode") == "External"
+            or rel.getAttribute("Type").endswith(SKIPPED_REL_TYPES)
+        ):
+            continue
+        if target.startswith("/"):
+            target_path = posixpath.normpath(target.lstrip("/"))
+        else:
+            target_path = posixpath.normpath(posixpath.join(part_dir, target))
+        if target_path in names:
+            targets.append(target_path)
+
+    return targets
+
+
+def get_visible_images(
+    pptx_path: Path,
     slide_info: list[dict],
-    visible_images: list[Path],
     temp_dir: Path,
-) -> list[tuple[Path, str]]:
+    cache_dir: Path | None,
+    manifest_path: Path | None = None,
+) -> list[Path | Image.Image]:
+    if cache_dir is None:
+        return convert_to_images(pptx_path, temp_dir)
+
+    visible = [(i, info["name"]) for i, info in enumerate(slide_info, 1) if not info["hidden"]]
+    visible_names = [name for _, name in visible]
+    hashes = get_slide_hashes(pptx_path, visible_names, [i for i, _ in visible])
+    cached = [cache_dir / f"{h}.jpg" for h in hashes]
+    # Subset renders carry slide numbers from the temporary deck, so they are kept
+    # apart from full renders and only ever reused by --changed-since runs
+    subset_cache_dir = cache_dir / "subset"
+
+    if manifest_path is not None:
+        previous = read_manifest(manifest_path)
+        changed = [
+            name for name, h in zip(visible_names, hashes) if previous.get(name) != h
+        ]
+        if changed:
+            print(f"Changed since {manifest_path}: {', '.join(changed)}")
+        sources = [
+            path if path.exists() or not (subset_cache_dir / path.name).exists()
+            else subset_cache_dir / path.name
+            for path in cached
+        ]
+    else:
+        sources = cached
+
+    missing = [i for i, path in enumerate(sources) if not path.exists()]
+    rendered = None
+
+    if missing and manifest_path is not None and len(missing) < len(cached):
+        subset_dir = temp_dir / "changed"
+        subset_dir.mkdir()
+        subset_pptx = subset_dir / pptx_path.name
+        build_subset_deck(pptx_path, [visible_names[i] for i in missing], subset_pptx)
+        images = convert_to_images(subset_pptx, subset_dir)
+        if len(images) == len(missing):
+            rendered = list(zip(images, [subset_cache_dir / cached[i].name for i in missing]))
+            print(f"Rendered {len(missing)} of {len(cached)} slides")
+
+    if missing and rendered is None:
+        images = convert_to_images(pptx_path, temp_dir)
+        if len(images) != len(cached):
+            return images
+        rendered = list(zip(images, cached))
+        sources = cached
+
+    rendered_images = {cache_path: image for image, cache_path in rendered or []}
+    for cache_path, image in rendered_images.items():
+        if not cache_path.exists():
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            image.save(cache_path, "JPEG", quality=JPEG_QUALITY)
+
+    if manifest_path is not None:
+        write_manifest(manifest_path, dict(zip(visible_names, hashes)))
+
+    # Mark the images this run reads as recently used, then evict what no run needs
+    for path in sources:
+        if path not in rendered_images:
+            _touch(path)
+    prune_cache(cache_dir, keep=set(sources))
+
+    return [rendered_images.get(path, path) for path in sources]
+
+
+def _touch(path: Path) -> None:
+    try:
+        path.touch()
+    except OSError:
+        pass
+
+
+def prune_cache(
+    cache_dir: Path,
+    keep: set[Path] = frozenset(),
+    max_age_days: float = CACHE_MAX_AGE_DAYS,
+    max_bytes: int = CACHE_MAX_BYTES,
+) -> int:
+    entries = []
+    for path in cache_dir.rglob("*.jpg"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    # Oldest first: expired entries go, then the least recently used until under the cap
+    entries.sort(key=lambda entry: entry[0])
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in entries:
+        if path in keep or (mtime >= cutoff and total <= max_bytes):
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache(cache_dir: Path) -> int:
+    if not cache_dir.exists():
+        return 0
+    return prune_cache(cache_dir, max_age_days=0, max_bytes=0)
+
+
+def build_subset_deck(pptx_path: Path, slide_names: list[str], output_path: Path) -> None:
+    keep = set(slide_names)
+
+    with zipfile.ZipFile(pptx_path, "r") as zf:
+        rid_to_slide = _get_rid_to_slide(zf)
+
+        def filter_sld_id(match: re.Match) -> str:
+            rid = re.search(r'r:id="([^"]+)"', match.group(0))
+            if rid and rid_to_slide.get(rid.group(1)) in keep:
+                return match.group(0)
+            return ""
+
+        pres_content = zf.read("ppt/presentation.xml").decode("utf-8")
+        pres_content = SLD_ID_PATTERN.sub(filter_sld_id, pres_content)
+
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as out:
+            for item in zf.infolist():
+                if item.filename == "ppt/presentation.xml":
+                    out.writestr(item, pres_content.encode("utf-8"))
+                else:
+                    out.writestr(item, zf.read(item))
+
+
+def read_manifest(manifest_path: Path) -> dict[str, str]:
+    if not manifest_path.exists():
+        return {}
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("width") != THUMBNAIL_WIDTH:
+        return {}
+    return manifest.get("slides", {})
+
+
+def write_manifest(manifest_path: Path, slide_hashes: dict[str, str]) -> None:
+    manifest = {"width": THUMBNAIL_WIDTH, "slides": slide_hashes}
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def build_slide_list(
+    slide_info: list[dict],
+    visible_images: list[Path | Image.Image],
+) -> list[tuple[Path | Image.Image, str]]:
     if visible_images:
-        with Image.open(visible_images[0]) as img:
-            placeholder_size = img.size
+        placeholder_size = _image_size(visible_images[0])
     else:
         placeholder_size = (1920, 1080)
 
@@ -134,10 +429,8 @@ def build_slide_list(
 
     for info in slide_info:
         if info["hidden"]:
-            placeholder_path = temp_dir / f"hidden-{info['name']}.jpg"
             placeholder_img = create_hidden_placeholder(placeholder_size)
-            placeholder_img.save(placeholder_path, "JPEG")
-            slides.append((placeholder_path, f"{info['name']} (hidden)"))
+            slides.append((placeholder_img, f"{info['name']} (hidden)"))
         else:
             if visible_idx < len(visible_images):
                 slides.append((visible_images[visible_idx], info["name"]))
@@ -155,7 +448,7 @@ def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
     return img
 
 
-def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
+def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Image.Image]:
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
     result = subprocess.run(
@@ -175,26 +468,54 @@ def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
     if result.returncode != 0 or not pdf_path.exists():
         raise RuntimeError("PDF conversion failed")
 
+    return rasterize_pdf(pdf_path.read_bytes(), THUMBNAIL_WIDTH)
+
+
+def rasterize_pdf(pdf_bytes: bytes, width: int) -> list[Image.Image]:
+    if pdfium is None:
+        return _rasterize_with_pdftoppm(pdf_bytes, width)
+
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        images = []
+        for page in pdf:
+            bitmap = page.render(scale=width / page.get_width())
+            images.append(bitmap.to_pil().convert("RGB"))
+        return images
+    finally:
+        pdf.close()
+
+
+def _rasterize_with_pdftoppm(pdf_bytes: bytes, width: int) -> list[Image.Image]:
     result = subprocess.run(
-        [
-            "pdftoppm",
-            "-jpeg",
-            "-r",
-            str(CONVERSION_DPI),
-            str(pdf_path),
-            str(temp_dir / "slide"),
-        ],
+        ["pdftoppm", "-scale-to-x", str(width), "-scale-to-y", "-1", "-"],
+        input=pdf_bytes,
         capture_output=True,
-        text=True,
     )
     if result.returncode != 0:
         raise RuntimeError("Image conversion failed")
 
-    return sorted(temp_dir.glob("slide-*.jpg"))
+    return _split_ppm_stream(result.stdout)
+
+
+def _split_ppm_stream(data: bytes) -> list[Image.Image]:
+    images = []
+    pos = 0
+
+    while pos < len(data):
+        match = PPM_HEADER_PATTERN.match(data, pos)
+        if not match:
+            raise RuntimeError("Unexpected pdftoppm output")
+        w, h, _ = (int(g) for g in match.groups())
+        end = match.end() + w * h * 3
+        images.append(Image.frombytes("RGB", (w, h), data[match.end():end]))
+        pos = end
+
+    return images
 
 
 def create_grids(
-    slides: list[tuple[Path, str]],
+    slides: list[tuple[Path | Image.Image, str]],
     cols: int,
     width: int,
     output_path: Path,
@@ -223,15 +544,15 @@ def create_grids(
 
 
 def create_grid(
-    slides: list[tuple[Path, str]],
+    slides: list[tuple[Path | Image.Image, str]],
     cols: int,
     width: int,
 ) -> Image.Image:
     font_size = int(width * FONT_SIZE_RATIO)
     label_padding = int(font_size * LABEL_PADDING_RATIO)
 
-    with Image.open(slides[0][0]) as img:
-        aspect = img.height / img.width
+    slide_w, slide_h = _image_size(slides[0][0])
+    aspect = slide_h / slide_w
     height = int(width * aspect)
 
     rows = (len(slides) + cols - 1) // cols
@@ -246,27 +567,30 @@ def create_grid(
     except Exception:
         font = ImageFont.load_default()
 
-    for i, (img_path, slide_name) in enumerate(slides):
-        row, col = i // cols, i % cols
-        x = col * width + (col + 1) * GRID_PADDING
-        y_base = (
-            row * (height + font_size + label_padding * 2) + (row + 1) * GRID_PADDING
-        )
-
-        label = slide_name
-        bbox = draw.textbbox((0, 0), label, font=font)
-        text_w = bbox[2] - bbox[0]
-        draw.text(
-            (x + (width - text_w) // 2, y_base + label_padding),
-            label,
-            fill="black",
-            font=font,
+    with ThreadPoolExecutor() as executor:
+        thumbnails = executor.map(
+            lambda slide: load_thumbnail(slide[0], width, height), slides
         )
 
-        y_thumbnail = y_base + label_padding + font_size + label_padding
+        for i, ((_, slide_name), img) in enumerate(zip(slides, thumbnails)):
+            row, col = i // cols, i % cols
+            x = col * width + (col + 1) * GRID_PADDING
+            y_base = (
+                row * (height + font_size + label_padding * 2) + (row + 1) * GRID_PADDING
+            )
+
+            label = slide_name
+            bbox = draw.textbbox((0, 0), label, font=font)
+            text_w = bbox[2] - bbox[0]
+            draw.text(
+                (x + (width - text_w) // 2, y_base + label_padding),
+                label,
+                fill="black",
+                font=font,
+            )
+
+            y_thumbnail = y_base + label_padding + font_size + label_padding
 
-        with Image.open(img_path) as img:
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
             w, h = img.size
             tx = x + (width - w) // 2
             ty = y_thumbnail + (height - h) // 2
@@ -285,5 +609,24 @@ def create_grid(
     return grid
 
 
+def load_thumbnail(source: Path | Image.Image, width: int, height: int) -> Image.Image:
+    if isinstance(source, Image.Image):
+        img = source.copy()
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        return img
+
+    with Image.open(source) as img:
+        img.draft("RGB", (width, height))
+        img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        return img.copy()
+
+
+def _image_size(source: Path | Image.Image) -> tuple[int, int]:
+    if isinstance(source, Image.Image):
+        return source.size
+    with Image.open(source) as img:
+        return img.size
+
+
 if __name__ == "__main__":
     main()
@@ -1,69 +1,94 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
+UI/UX Pro Max Core - BM25F search engine for UI/UX style guides (weighted fields, stemming, bigrams)
 """
 
-import csv
+import bisect
+import heapq
+import json
+import mmap
+import os
 import re
+import sys
+import tempfile
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from itertools import chain
 from pathlib import Path
 from math import log
-from collections import defaultdict
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Fitted indexes are cached here, one JSON file per CSV, and rebuilt when the CSV changes
+INDEX_CACHE_DIR = Path(tempfile.gettempdir()) / "ui-ux-pro-max-index"
+INDEX_VERSION = 5
+# Most recent distinct searches whose results are kept in memory
+RESULT_CACHE_SIZE = 1024
+
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
         "search_cols": ["Style Category", "Keywords", "Best For", "Type", "AI Prompt Keywords"],
-        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity", "AI Prompt Keywords", "CSS/Technical Keywords", "Implementation Checklist", "Design System Variables"]
+        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity", "AI Prompt Keywords", "CSS/Technical Keywords", "Implementation Checklist", "Design System Variables"],
+        "field_weights": {"Style Category": 3, "Keywords": 2, "Best For": 1.5, "Type": 1, "AI Prompt Keywords": 1}
     },
     "color": {
         "file": "colors.csv",
         "search_cols": ["Product Type", "Notes"],
-        "output_cols": ["Product Type", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Notes"]
+        "output_cols": ["Product Type", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Notes"],
+        "field_weights": {"Product Type": 3, "Notes": 1}
     },
     "chart": {
         "file": "charts.csv",
         "search_cols": ["Data Type", "Keywords", "Best Chart Type", "Accessibility Notes"],
-        "output_cols": ["Data Type", "Keywords", "Best Chart Type", "Secondary Options", "Color Guidance", "Accessibility Notes", "Library Recommendation", "Interactive Level"]
+        "output_cols": ["Data Type", "Keywords", "Best Chart Type", "Secondary Options", "Color Guidance", "Accessibility Notes", "Library Recommendation", "Interactive Level"],
+        "field_weights": {"Data Type": 3, "Keywords": 2, "Best Chart Type": 2, "Accessibility Notes": 1}
     },
     "landing": {
         "file": "landing.csv",
         "search_cols": ["Pattern Name", "Keywords", "Conversion Optimization", "Section Order"],
-        "output_cols": ["Pattern Name", "Keywords", "Section Order", "Primary CTA Placement", "Color Strategy", "Conversion Optimization"]
+        "output_cols": ["Pattern Name", "Keywords", "Section Order", "Primary CTA Placement", "Color Strategy", "Conversion Optimization"],
+        "field_weights": {"Pattern Name": 3, "Keywords": 2, "Conversion Optimization": 1, "Section Order": 1}
     },
     "product": {
         "file": "products.csv",
         "search_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Key Considerations"],
-        "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"]
+        "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"],
+        "field_weights": {"Product Type": 3, "Keywords": 2, "Primary Style Recommendation": 1.5, "Key Considerations": 1}
     },
     "ux": {
         "file": "ux-guidelines.csv",
         "search_cols": ["Category", "Issue", "Description", "Platform"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "field_weights": {"Category": 2, "Issue": 3, "Description": 1, "Platform": 1}
     },
     "typography": {
         "file": "typography.csv",
         "search_cols": ["Font Pairing Name", "Category", "Mood/Style Keywords", "Best For", "Heading Font", "Body Font"],
-        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"]
+        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"],
+        "field_weights": {"Font Pairing Name": 3, "Category": 1.5, "Mood/Style Keywords": 2, "Best For": 1.5, "Heading Font": 1, "Body Font": 1}
     },
     "icons": {
         "file": "icons.csv",
         "search_cols": ["Category", "Icon Name", "Keywords", "Best For"],
-        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"]
+        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"],
+        "field_weights": {"Category": 1.5, "Icon Name": 3, "Keywords": 2, "Best For": 1}
     },
     "react": {
         "file": "react-performance.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "field_weights": {"Category": 1.5, "Issue": 3, "Keywords": 2, "Description": 1}
     },
     "web": {
         "file": "web-interface.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "field_weights": {"Category": 1.5, "Issue": 3, "Keywords": 2, "Description": 1}
     }
 }
 
@@ -86,25 +111,81 @@ STACK_CONFIG = {
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
+    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"],
+    "field_weights": {"Category": 1.5, "Guideline": 3, "Description": 1, "Do": 1, "Don't": 1}
 }
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Index-time text processing. min_length 2 keeps terms like "ui", "ux", "3d" and "ai";
+# bigrams index adjacent word pairs so phrase matches ("dark mode") rank higher.
+TOKENIZER_CONFIG = {"min_length": 2, "stem": True, "bigrams": True}
+# Scoring engine: "numpy" always uses the NumPy CSR backend when NumPy is installed, "python"
+# never does, "auto" only for indexes large enough to repay importing NumPy
+SCORING_BACKEND = "auto"
+VECTORIZE_MIN_DOCS = 2000
+
+STOPWORDS = {"an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or", "the", "to", "vs", "with"}
+
+# Sources of the unified index: every domain, and every stack as "stack:<name>"
+AVAILABLE_SOURCES = list(CSV_CONFIG.keys()) + [f"stack:{stack}" for stack in STACK_CONFIG]
+
+
+# ============ TOKENIZER ============
+class Tokenizer:
+    """Lowercase, split on punctuation, drop stopwords and short words, optionally stem and add bigrams"""
+
+    def __init__(self, min_length=2, stem=True, bigrams=True):
+        self.min_length = min_length
+        self.stem = stem
+        self.bigrams = bigrams
+
+    def config(self):
+        return {"min_length": self.min_length, "stem": self.stem, "bigrams": self.bigrams}
+
+    @staticmethod
+    def stem_word(word):
+        """Light suffix stripping (plurals and -ing) so "buttons"/"button" and "loading"/"load" match"""
+        if len(word) <= 3 or not word.isalpha():
+            return word
+        if word.endswith("ies") and len(word) > 4:
+            return word[:-3] + "y"
+        if word.endswith("sses"):
+            return word[:-2]
+        if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+            return word[:-1]
+        if word.endswith("ing") and len(word) > 5:
+            return word[:-3]
+        return word
+
+    def words(self, text):
+        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
+        words = [w for w in text.split() if len(w) >= self.min_length and w not in STOPWORDS]
+        if self.stem:
+            words = [self.stem_word(w) for w in words]
+        return words
+
+    def __call__(self, text):
+        words = self.words(text)
+        if self.bigrams:
+            return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return words
+
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search, backed by an inverted index"""
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.postings = {}  # term -> {doc index: term frequency}
+        self.max_scores = {}  # term -> highest score it contributes to any document
         self.N = 0
+        self.version = None  # (INDEX_VERSION, source signature) of an index built from a CSV
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
@@ -113,78 +194,725 @@ class BM25:
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        corpus = [self.tokenize(doc) for doc in documents]
+        self.N = len(corpus)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.doc_lengths = [len(doc) for doc in corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
+        for idx, doc in enumerate(corpus):
             for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+                term_postings = self.postings.setdefault(word, {})
+                term_postings[idx] = term_postings.get(idx, 0) + 1
 
-        for word, freq in self.doc_freqs.items():
+        for word, term_postings in self.postings.items():
+            freq = len(term_postings)
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        self._compute_max_scores()
+
+    def _term_score(self, token, idx, tf):
+        return self._weight(self.idf[token], tf, self.doc_lengths[idx])
+
+    def _weight(self, idf, tf, doc_len):
+        """BM25 term weight; plain arithmetic, so it also works elementwise on NumPy arrays"""
+        numerator = tf * (self.k1 + 1)
+        denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
+        return idf * numerator / denominator
+
+    def _compute_max_scores(self):
+        """Per-term score upper bounds used by top_k to skip documents early"""
+        self.max_scores = {
+            token: max(self._term_score(token, idx, tf) for idx, tf in term_postings.items())
+            for token, term_postings in self.postings.items()
+        }
 
     def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+        """Score all documents against query, visiting only the query terms' postings"""
+        scores = [0] * self.N
+        for token in self.tokenize(query):
+            if token in self.idf:
+                for idx, tf in self.postings[token].items():
+                    scores[idx] += self._term_score(token, idx, tf)
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+        return sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
 
-            scores.append((idx, score))
+    def top_k(self, query, k, allowed=None):
+        """
+        Best k (index, score) pairs with score > 0, in the same order as score().
+        If given, `allowed` is indexed by document and only truthy documents are ranked.
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+        Terms are visited in MaxScore order (highest upper bound first). Once the
+        remaining terms together cannot lift an unseen document past the current
+        k-th best, only documents already seen are updated. Survivors are then
+        rescored exactly and the top k picked with a heap.
+        """
+        tokens = [t for t in self.tokenize(query) if t in self.idf]
+        if not tokens or k <= 0:
+            return []
 
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        terms = sorted(counts, key=lambda t: self.max_scores[t] * counts[t], reverse=True)
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + self.max_scores[terms[i]] * counts[terms[i]]
 
-# ============ SEARCH FUNCTIONS ============
+        partial = {}
+        for i, token in enumerate(terms):
+            weight = counts[token]
+            term_postings = self.postings[token]
+            threshold = heapq.nlargest(k, partial.values())[-1] if len(partial) >= k else 0.0
+            if threshold > 0 and remaining[i] * (1 + 1e-9) < threshold:
+                # Non-essential term: unseen documents can no longer reach the top k
+                for idx in list(partial):
+                    tf = term_postings.get(idx)
+                    if tf:
+                        partial[idx] += weight * self._term_score(token, idx, tf)
+                    if (partial[idx] + remaining[i + 1]) * (1 + 1e-9) < threshold:
+                        del partial[idx]
+            else:
+                for idx, tf in term_postings.items():
+                    if allowed is None or allowed[idx]:
+                        partial[idx] = partial.get(idx, 0.0) + weight * self._term_score(token, idx, tf)
+
+        # Exact scores in query order, so ties and rounding match score()
+        candidates = []
+        for idx in partial:
+            total = 0
+            for token in tokens:
+                tf = self.postings[token].get(idx)
+                if tf:
+                    total += self._term_score(token, idx, tf)
+            candidates.append((idx, total))
+        best = heapq.nsmallest(k, candidates, key=lambda x: (-x[1], x[0]))
+        return [(idx, score) for idx, score in best if score > 0]
+
+    def to_dict(self):
+        """Serializable form of the fitted index"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "N": self.N,
+            "avgdl": self.avgdl,
+            "doc_lengths": self.doc_lengths,
+            "idf": self.idf,
+            "postings": {term: list(p.items()) for term, p in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore an index produced by to_dict()"""
+        bm25 = cls(data["k1"], data["b"])
+        bm25.N = data["N"]
+        bm25.avgdl = data["avgdl"]
+        bm25.doc_lengths = data["doc_lengths"]
+        bm25.idf = data["idf"]
+        bm25.postings = {term: dict(p) for term, p in data["postings"].items()}
+        bm25._compute_max_scores()
+        return bm25
+
+    def _vectorize(self):
+        return SCORING_BACKEND == "numpy" or (SCORING_BACKEND == "auto" and self.N >= VECTORIZE_MIN_DOCS)
+
+    def engine(self):
+        """The scorer search should use: the CSR backend if enabled and available, else this index"""
+        if not self._vectorize() or self.N == 0 or _numpy() is None:
+            return self
+        if getattr(self, "_csr", None) is None:
+            self._csr = CSRScorer(self)
+        return self._csr
+
+
+class BM25F(BM25):
+    """Field-weighted BM25 (BM25F) for documents made of named, weighted fields
+
+    Each field's term frequency is normalized by that field's length relative to its
+    average, then weighted. The combined pseudo-frequency is computed at index time,
+    so each posting holds it directly and scoring costs the same as plain BM25.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
+        super().__init__(k1, b)
+        self.tokenizer = tokenizer or Tokenizer(**TOKENIZER_CONFIG)
+
+    def tokenize(self, text):
+        return self.tokenizer(text)
+
+    def fit(self, documents):
+        """Build index from documents given as lists of (field key, weight, text)"""
+        tokenized = []
+        field_totals = {}
+        for doc in documents:
+            fields = []
+            for key, weight, text in doc:
+                tokens = self.tokenize(text)
+                fields.append((key, weight, tokens))
+                total, count = field_totals.get(key, (0, 0))
+                field_totals[key] = (total + len(tokens), count + 1)
+            tokenized.append(fields)
+        self.N = len(tokenized)
+        if self.N == 0:
+            return
+        avg_lengths = {key: total / count for key, (total, count) in field_totals.items()}
+        self.doc_lengths = [sum(len(tokens) for _, _, tokens in fields) for fields in tokenized]
+        self.avgdl = sum(self.doc_lengths) / self.N
+
+        for idx, fields in enumerate(tokenized):
+            for key, weight, tokens in fields:
+                if not tokens:
+                    continue
+                norm = 1 - self.b + self.b * len(tokens) / avg_lengths[key]
+                for word, tf in Counter(tokens).items():
+                    term_postings = self.postings.setdefault(word, {})
+                    term_postings[idx] = term_postings.get(idx, 0.0) + weight * tf / norm
+
+        for word, term_postings in self.postings.items():
+            freq = len(term_postings)
+            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        self._compute_max_scores()
+
+    def _weight(self, idf, tf, doc_len):
+        return idf * tf * (self.k1 + 1) / (tf + self.k1)
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["tokenizer"] = self.tokenizer.config()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        bm25f = super().from_dict(data)
+        bm25f.tokenizer = Tokenizer(**data["tokenizer"])
+        return bm25f
+
+
+# ============ VECTORIZED BACKEND ============
+_NUMPY = []
+
+
+def _numpy():
+    """NumPy, imported on first use, or None if it is not installed"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append(numpy)
+    return _NUMPY[0]
+
+
+class CSRScorer:
+    """A fitted BM25 index as a term x document CSR matrix of precomputed BM25 weights
+
+    A query is a gather of its terms' rows summed into a dense score vector, in the
+    same order as BM25.score(), so rankings are identical to the pure-Python engine.
+    With SciPy installed, a batch of queries is one sparse (queries x terms) @
+    (terms x documents) product; otherwise the queries are scored one by one.
+    """
+
+    def __init__(self, bm25):
+        np = _numpy()
+        self.N = bm25.N
+        self.tokenize = bm25.tokenize
+        self.term_ids = dict(zip(bm25.postings, range(len(bm25.postings))))
+        lengths = np.fromiter(map(len, bm25.postings.values()), dtype=np.int64, count=len(bm25.postings))
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        nnz = int(self.indptr[-1])
+        postings = bm25.postings.values()
+        self.indices = np.fromiter(chain.from_iterable(postings), dtype=np.int64, count=nnz)
+        tfs = np.fromiter(chain.from_iterable(map(dict.values, postings)), dtype=np.float64, count=nnz)
+        idfs = np.repeat(np.fromiter(map(bm25.idf.__getitem__, bm25.postings), dtype=np.float64, count=len(lengths)), lengths)
+        # Same operations as BM25._term_score(), so weights are bit-identical
+        self.data = bm25._weight(idfs, tfs, np.asarray(bm25.doc_lengths, dtype=np.float64)[self.indices])
+        self._matrix = None
+
+    def _row(self, term_id):
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def scores(self, query):
+        """Dense score vector for one query"""
+        scores = _numpy().zeros(self.N)
+        for token in self.tokenize(query):
+            term_id = self.term_ids.get(token)
+            if term_id is not None:
+                indices, weights = self._row(term_id)
+                scores[indices] += weights
+        return scores
+
+    def _rank(self, scores, k, allowed=None):
+        """Best k (index, score) pairs with score > 0, ties broken by lower index like BM25.top_k()"""
+        np = _numpy()
+        if allowed is not None:
+            scores = np.where(np.asarray(allowed, dtype=bool), scores, 0.0)
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            # Keep everything tied with the k-th best so the index tie-break is exact
+            kth = np.partition(scores[hits], len(hits) - k)[len(hits) - k]
+            hits = hits[scores[hits] >= kth]
+        order = np.lexsort((hits, -scores[hits]))[:k]
+        return [(int(idx), float(scores[idx])) for idx in hits[order]]
+
+    def top_k(self, query, k, allowed=None):
+        if k <= 0:
+            return []
+        return self._rank(self.scores(query), k, allowed)
+
+    def score_batch(self, queries):
+        """(queries x documents) score matrix as one sparse product, or None without SciPy"""
+        try:
+            from scipy import sparse
+        except ImportError:
+            return None
+        rows, cols, counts = [], [], []
+        for row, query in enumerate(queries):
+            for token, count in Counter(self.tokenize(query)).items():
+                term_id = self.term_ids.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    cols.append(term_id)
+                    counts.append(count)
+        if self._matrix is None:
+            self._matrix = sparse.csr_matrix((self.data, self.indices, self.indptr), shape=(len(self.term_ids), self.N))
+        query_matrix = sparse.csr_matrix((counts, (rows, cols)), shape=(len(queries), len(self.term_ids)), dtype=float)
+        return (query_matrix @ self._matrix).toarray()
+
+    def top_k_batch(self, queries, k, allowed=None):
+        """top_k() for every query, scored together when SciPy is installed"""
+        if k <= 0 or not queries:
+            return [[] for _ in queries]
+        scores = self.score_batch(queries)
+        if scores is None:
+            return [self.top_k(query, k, allowed) for query in queries]
+        # Round away summation-order noise so exact ties stay ties, as in top_k()
+        return [self._rank(row, k, allowed) for row in _numpy().round(scores, 9)]
+
+
+# ============ INDEX CACHE ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
+    import csv
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+# (filepath, search_cols, field_weights) -> (source signature, ColumnarTable, TableBM25F)
+_INDEXES = {}
+
+
+def _cache_path(filepath, key):
+    """Cache file for one source file and a JSON-serializable variant key"""
+    import hashlib
+    digest = hashlib.sha1(json.dumps([str(filepath.resolve()), key]).encode("utf-8")).hexdigest()[:16]
+    return INDEX_CACHE_DIR / f"{filepath.stem}-{digest}.json"
+
+
+def _table_path(filepath, search_cols, field_weights):
+    return _cache_path(filepath, [search_cols, field_weights, TOKENIZER_CONFIG]).with_suffix(".table")
+
+
+def _signature(*filepaths):
+    """Identifies the current version of the source files of a cache entry"""
+    signature = []
+    for filepath in filepaths:
+        stat = filepath.stat()
+        signature.append([stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def _read_cache(cache_path, signature):
+    """Return the cached payload if it was built from these versions of the source files"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != INDEX_VERSION or cached.get("signature") != signature:
+        return None
+    return cached["payload"]
+
+
+def _write_cache(cache_path, signature, payload):
+    """Write a JSON cache file atomically; caching is best-effort"""
+    _write_file(cache_path, json.dumps({"version": INDEX_VERSION, "signature": signature, "payload": payload}).encode("utf-8"))
+
+
+def _write_file(cache_path, data):
+    """Write bytes to the index cache atomically, ignoring failures"""
+    try:
+        INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+# ============ COMPILED TABLES ============
+TABLE_MAGIC = b"UXPMTBL1"
+_MISSING = 0xFFFFFFFF  # string id of a cell missing from a short CSV row
+
+
+class ColumnarTable:
+    """A CSV and its BM25F index compiled into one memory-mapped columnar file
+
+    Layout: TABLE_MAGIC, a uint32 header length, a JSON header (versions, row count,
+    columns, BM25 parameters and where each section starts), then 8-byte aligned
+    arrays of native byte order:
+        strings.offsets, strings.blob     every distinct cell value once, UTF-8
+        cells                             a string id per row, one column after another
+        terms.offsets, terms.blob         index terms, sorted by their UTF-8 bytes
+        idf, max_scores                   per term
+        postings.offsets, .docs, .tf      each term's documents and BM25F pseudo-frequencies
+        doc_lengths                       per row
+
+    Nothing is decoded up front: cells are read only for the rows a search returns,
+    and a term's postings only when a query uses it.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer  # keeps the mapping alive
+        view = memoryview(buffer)
+        if bytes(view[:len(TABLE_MAGIC)]) != TABLE_MAGIC:
+            raise ValueError("not a compiled table")
+        start = len(TABLE_MAGIC) + 4
+        header_length = int.from_bytes(view[len(TABLE_MAGIC):start], "little")
+        self.header = json.loads(bytes(view[start:start + header_length]))
+        data_start = _align(start + header_length)
+        sections = {}
+        for name, (offset, length, typecode) in self.header["sections"].items():
+            section = view[data_start + offset:data_start + offset + length]
+            sections[name] = section if typecode == "B" else section.cast(typecode)
+        self.n_rows = self.header["rows"]
+        self.columns = self.header["columns"]
+        self._column_index = {col: i for i, col in enumerate(self.columns)}
+        self._string_offsets = sections["strings.offsets"]
+        self._strings = sections["strings.blob"]
+        self._cells = sections["cells"]
+        self._term_offsets = sections["terms.offsets"]
+        self._terms = sections["terms.blob"]
+        self.n_terms = len(self._term_offsets) - 1
+        self._idf = sections["idf"]
+        self._max_scores = sections["max_scores"]
+        self._posting_offsets = sections["postings.offsets"]
+        self._docs = sections["postings.docs"]
+        self._tfs = sections["postings.tf"]
+        self.doc_lengths = sections["doc_lengths"]
+
+    @classmethod
+    def open(cls, path, signature):
+        """Map a compiled table, or None if it is missing, damaged or built from another version of its CSV"""
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            table = cls(buffer)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+        header = table.header
+        if header["version"] != INDEX_VERSION or header["signature"] != signature or header["byteorder"] != sys.byteorder:
+            return None
+        return table
+
+    def value(self, idx, col):
+        string_id = self._cells[self._column_index[col] * self.n_rows + idx]
+        if string_id == _MISSING:
+            return None
+        return str(self._strings[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], "utf-8")
+
+    def row(self, idx, columns):
+        """The given columns of one row, as csv.DictReader returns them"""
+        return {col: self.value(idx, col) for col in columns if col in self._column_index}
+
+    def term(self, i):
+        return str(self._terms[self._term_offsets[i]:self._term_offsets[i + 1]], "utf-8")
+
+    def find_term(self, term):
+        """Position of a term in the sorted term list (binary search on the mapping), or None"""
+        target = term.encode("utf-8")
+        offsets, terms = self._term_offsets, self._terms
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(terms[offsets[mid]:offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_terms and terms[offsets[lo]:offsets[lo + 1]] == target:
+            return lo
+        return None
+
+    def term_entry(self, i):
+        """(idf, max score, {doc: tf}) of the i-th term"""
+        start, end = self._posting_offsets[i], self._posting_offsets[i + 1]
+        return self._idf[i], self._max_scores[i], dict(zip(self._docs[start:end], self._tfs[start:end]))
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _offsets_and_blob(items):
+    offsets = array("I", [0])
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return offsets, b"".join(items)
+
+
+def compile_table(filepath, search_cols, field_weights, signature):
+    """Compile a CSV and its BM25F index into ColumnarTable's file format; returns the file's bytes"""
+    rows = _load_csv(filepath)
+    # One field per search column, weighted per CSV_CONFIG
+    documents = [[(col, field_weights.get(col, 1), str(row.get(col, ""))) for col in search_cols] for row in rows]
+    bm25 = BM25F()
+    bm25.fit(documents)
+
+    columns = [col for col in rows[0] if col is not None] if rows else []
+    strings, string_ids = [], {}
+    cells = array("I")
+    for col in columns:
+        for row in rows:
+            value = row.get(col)
+            if value is None:
+                cells.append(_MISSING)
+                continue
+            string_id = string_ids.get(value)
+            if string_id is None:
+                string_id = string_ids[value] = len(strings)
+                strings.append(value.encode("utf-8"))
+            cells.append(string_id)
+
+    terms = sorted(bm25.postings, key=lambda term: term.encode("utf-8"))
+    posting_offsets, docs, tfs = array("I", [0]), array("I"), array("d")
+    for term in terms:
+        term_postings = bm25.postings[term]
+        docs.extend(term_postings.keys())
+        tfs.extend(term_postings.values())
+        posting_offsets.append(len(docs))
+
+    string_offsets, string_blob = _offsets_and_blob(strings)
+    term_offsets, term_blob = _offsets_and_blob([term.encode("utf-8") for term in terms])
+    arrays = {
+        "strings.offsets": string_offsets,
+        "strings.blob": string_blob,
+        "cells": cells,
+        "terms.offsets": term_offsets,
+        "terms.blob": term_blob,
+        "idf": array("d", (bm25.idf[term] for term in terms)),
+        "max_scores": array("d", (bm25.max_scores[term] for term in terms)),
+        "postings.offsets": posting_offsets,
+        "postings.docs": docs,
+        "postings.tf": tfs,
+        "doc_lengths": array("I", bm25.doc_lengths),
+    }
+
+    sections, chunks, offset = {}, [], 0
+    for name, data in arrays.items():
+        raw = data.tobytes() if isinstance(data, array) else data
+        sections[name] = [offset, len(raw), data.typecode if isinstance(data, array) else "B"]
+        padding = _align(len(raw)) - len(raw)
+        chunks.append(raw + b"\0" * padding)
+        offset += len(raw) + padding
+    header = json.dumps({
+        "version": INDEX_VERSION,
+        "signature": signature,
+        "byteorder": sys.byteorder,
+        "rows": len(rows),
+        "columns": columns,
+        "bm25": {"k1": bm25.k1, "b": bm25.b, "N": bm25.N, "avgdl": bm25.avgdl, "tokenizer": bm25.tokenizer.config()},
+        "sections": sections,
+    }).encode("utf-8")
+    prefix = TABLE_MAGIC + len(header).to_bytes(4, "little") + header
+    return prefix + b"\0" * (_align(len(prefix)) - len(prefix)) + b"".join(chunks)
+
+
+class TableBM25F(BM25F):
+    """BM25F over a ColumnarTable; each term's postings are read from the table the first time a query uses it"""
+
+    def __init__(self, table):
+        params = table.header["bm25"]
+        super().__init__(params["k1"], params["b"], Tokenizer(**params["tokenizer"]))
+        self.table = table
+        self.N = params["N"]
+        self.avgdl = params["avgdl"]
+        self.doc_lengths = table.doc_lengths
+        self._absent = set()  # query terms known not to be in the table
+        self._lock = threading.Lock()
+
+    def _load_terms(self, tokens):
+        # Searches on other threads read these dicts without locking, keyed on
+        # `term in self.idf`, so a term's idf is published only once its postings
+        # and max score are in place; loads themselves are serialized
+        missing = [t for t in tokens if t not in self.idf and t not in self._absent]
+        if not missing:
+            return
+        with self._lock:
+            for token in missing:
+                if token in self.idf or token in self._absent:
+                    continue
+                i = self.table.find_term(token)
+                if i is None:
+                    self._absent.add(token)
+                    continue
+                idf, max_score, postings = self.table.term_entry(i)
+                self.postings[token] = postings
+                self.max_scores[token] = max_score
+                self.idf[token] = idf
+
+    def score(self, query):
+        self._load_terms(self.tokenize(query))
+        return super().score(query)
+
+    def top_k(self, query, k, allowed=None):
+        self._load_terms(self.tokenize(query))
+        return super().top_k(query, k, allowed)
+
+    def engine(self):
+        # The CSR backend is built from every term's postings
+        if self._vectorize() and len(self.idf) < self.table.n_terms:
+            self._load_terms([self.table.term(i) for i in range(self.table.n_terms)])
+        return super().engine()
+
+
+def _get_index(filepath, search_cols, field_weights=None):
+    """The compiled table and BM25F index of a CSV, compiling the CSV again whenever it changes"""
+    field_weights = field_weights or {}
+    signature = _signature(filepath)
+    key = (filepath, tuple(search_cols), tuple(sorted(field_weights.items())))
+    cached = _INDEXES.get(key)
+    if cached and cached[0] == signature:
+        return cached[1], cached[2]
+
+    table_path = _table_path(filepath, search_cols, field_weights)
+    table = ColumnarTable.open(table_path, signature)
+    if table is None:
+        data = compile_table(filepath, search_cols, field_weights, signature)
+        _write_file(table_path, data)
+        table = ColumnarTable(data)
+
+    bm25 = TableBM25F(table)
+    bm25.version = (INDEX_VERSION, tuple(map(tuple, signature)))
+    _INDEXES[key] = (signature, table, bm25)
+    return table, bm25
+
+
+def build_tables():
+    """Compile every domain and stack CSV into the index cache; returns [(csv path, table path, size)]"""
+    built = []
+    for source in AVAILABLE_SOURCES:
+        filepath, search_cols, _, field_weights = _source_config(source)
+        if filepath.exists():
+            table_path = _table_path(filepath, search_cols, field_weights)
+            data = compile_table(filepath, search_cols, field_weights, _signature(filepath))
+            _write_file(table_path, data)
+            built.append((filepath, table_path, len(data)))
+    return built
+
+
+# ============ SEARCH FUNCTIONS ============
+class ResultCache:
+    """Bounded LRU memo of search results, with hit/miss counters
+
+    Keys include the version of the index that produced the results, so editing a
+    CSV makes its old entries unreachable; they age out as new results come in.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+# Shared by search(), search_stack(), search_many() and so by the design-system generator
+_RESULTS = ResultCache()
+
+
+def cache_stats():
+    """Hit/miss statistics of the shared search result cache"""
+    return _RESULTS.stats()
+
+
+def _result_key(filepath, search_cols, output_cols, field_weights, bm25, query, max_results):
+    # The query is normalized to its tokens: case, punctuation and stopwords do not change results
+    return (str(filepath), tuple(search_cols), tuple(output_cols), tuple(sorted((field_weights or {}).items())),
+            bm25.version, tuple(bm25.tokenize(query)), max_results)
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, field_weights=None):
+    """Core search function using field-weighted BM25"""
     if not filepath.exists():
         return []
 
-    data = _load_csv(filepath)
+    table, bm25 = _get_index(filepath, search_cols, field_weights)
+    key = _result_key(filepath, search_cols, output_cols, field_weights, bm25, query, max_results)
+    results = _RESULTS.get(key)
+    if results is None:
+        # Top results with score > 0; only their output columns are read from the table
+        results = tuple(table.row(idx, output_cols) for idx, score in bm25.engine().top_k(query, max_results))
+        _RESULTS.put(key, results)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    # Copies, so callers can modify what they get back without touching the cache
+    return [dict(row) for row in results]
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+def _search_csv_batch(filepath, search_cols, output_cols, queries, max_results, field_weights=None):
+    """_search_csv() for many queries against one CSV, scored together when vectorized"""
+    if not filepath.exists():
+        return [[] for _ in queries]
+
+    table, bm25 = _get_index(filepath, search_cols, field_weights)
+    keys = [_result_key(filepath, search_cols, output_cols, field_weights, bm25, query, max_results) for query in queries]
+    batch = [_RESULTS.get(key) for key in keys]
 
-    return results
+    # Only cache misses are scored
+    misses = [i for i, results in enumerate(batch) if results is None]
+    engine = bm25.engine()
+    if isinstance(engine, CSRScorer):
+        batch_hits = engine.top_k_batch([queries[i] for i in misses], max_results)
+    else:
+        batch_hits = [engine.top_k(queries[i], max_results) for i in misses]
+    for i, hits in zip(misses, batch_hits):
+        batch[i] = tuple(table.row(idx, output_cols) for idx, _ in hits)
+        _RESULTS.put(keys[i], batch[i])
+
+    return [[dict(row) for row in results] for results in batch]
 
 
 def detect_domain(query):
@@ -220,7 +948,7 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, config.get("field_weights"))
 
     return {
         "domain": domain,
@@ -231,6 +959,35 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     }
 
 
+def search_many(queries, domain=None, max_results=MAX_RESULTS):
+    """search() for many queries; queries that resolve to the same domain are scored as one batch"""
+    domains = [domain or detect_domain(query) for query in queries]
+    by_domain = {}
+    for i, query_domain in enumerate(domains):
+        # Unknown domains fall back to the style CSV, as in search()
+        by_domain.setdefault(query_domain if query_domain in CSV_CONFIG else "style", []).append(i)
+
+    responses = [None] * len(queries)
+    for config_domain, positions in by_domain.items():
+        config = CSV_CONFIG[config_domain]
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            for i in positions:
+                responses[i] = {"error": f"File not found: {filepath}", "domain": domains[i]}
+            continue
+        batch = _search_csv_batch(filepath, config["search_cols"], config["output_cols"],
+                                  [queries[i] for i in positions], max_results, config.get("field_weights"))
+        for i, results in zip(positions, batch):
+            responses[i] = {
+                "domain": domains[i],
+                "query": queries[i],
+                "file": config["file"],
+                "count": len(results),
+                "results": results
+            }
+    return responses
+
+
 def search_stack(query, stack, max_results=MAX_RESULTS):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
@@ -241,7 +998,7 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, _STACK_COLS["field_weights"])
 
     return {
         "domain": "stack",
@@ -251,3 +1008,124 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+# ============ UNIFIED INDEX ============
+def _source_config(source):
+    """(csv path, search_cols, output_cols, field_weights) for a source id"""
+    if source.startswith("stack:"):
+        return DATA_DIR / STACK_CONFIG[source[len("stack:"):]]["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], _STACK_COLS["field_weights"]
+    config = CSV_CONFIG[source]
+    return DATA_DIR / config["file"], config["search_cols"], config["output_cols"], config.get("field_weights", {})
+
+
+class UnifiedIndex:
+    """One BM25F index over the rows of every domain and stack CSV
+
+    Each source occupies a contiguous range of document ids, so a source filter
+    is a mask over those ranges.
+    """
+
+    def __init__(self, sources, starts, tables, bm25f):
+        self.sources = sources  # source ids, in document order
+        self.starts = starts    # first document id of each source
+        self.tables = tables    # each source's ColumnarTable
+        self.bm25f = bm25f
+
+    def locate(self, idx):
+        """(source, table, row in that table) of a document id"""
+        i = bisect.bisect_right(self.starts, idx) - 1
+        return self.sources[i], self.tables[i], idx - self.starts[i]
+
+    def mask(self, sources):
+        """Per-document flags allowing only the given sources"""
+        allowed = bytearray(self.bm25f.N)
+        ends = self.starts[1:] + [self.bm25f.N]
+        for source, start, end in zip(self.sources, self.starts, ends):
+            if source in sources:
+                allowed[start:end] = b"\x01" * (end - start)
+        return allowed
+
+
+# (signature, UnifiedIndex)
+_UNIFIED = None
+
+
+def _get_unified_index():
+    """Build (or load from cache) the unified index over all available sources"""
+    global _UNIFIED
+    sources = [source for source in AVAILABLE_SOURCES if _source_config(source)[0].exists()]
+    signature = [sources, _signature(*(_source_config(source)[0] for source in sources))]
+    if _UNIFIED and _UNIFIED[0] == signature:
+        return _UNIFIED[1]
+
+    tables, starts, total = [], [], 0
+    for source in sources:
+        filepath, search_cols, _, weights = _source_config(source)
+        table = _get_index(filepath, search_cols, weights)[0]
+        tables.append(table)
+        starts.append(total)
+        total += table.n_rows
+
+    cache_path = _cache_path(DATA_DIR, ["unified", TOKENIZER_CONFIG])
+    cached = _read_cache(cache_path, signature)
+    bm25f = BM25F.from_dict(cached) if cached else None
+    if bm25f is None or bm25f.N != total:
+        documents = []
+        for source, table in zip(sources, tables):
+            _, search_cols, _, weights = _source_config(source)
+            for idx in range(table.n_rows):
+                row = table.row(idx, search_cols)
+                documents.append([(f"{source}:{col}", weights.get(col, 1), str(row.get(col, ""))) for col in search_cols])
+        bm25f = BM25F()
+        bm25f.fit(documents)
+        _write_cache(cache_path, signature, bm25f.to_dict())
+
+    index = UnifiedIndex(sources, starts, tables, bm25f)
+    _UNIFIED = (signature, index)
+    return index
+
+
+def _title_col(source):
+    """The highest-weighted search column, which names the row (e.g. "Guideline", "Style Category")"""
+    weights = _source_config(source)[3]
+    return max(weights, key=weights.get)
+
+
+def search_all(query, sources=None, max_results=MAX_RESULTS):
+    """Search several domain and stack CSVs in one pass; rows with the same title in different sources are merged"""
+    unknown = [source for source in sources or [] if source not in AVAILABLE_SOURCES]
+    if unknown:
+        return {"error": f"Unknown source: {', '.join(unknown)}. Available: {', '.join(AVAILABLE_SOURCES)}"}
+
+    index = _get_unified_index()
+    sources = [source for source in index.sources if not sources or source in sources]
+    allowed = index.mask(set(sources)) if len(sources) < len(index.sources) else None
+
+    # Duplicates collapse into one result, so fetch more hits until there are enough
+    k = max_results
+    while True:
+        hits = index.bm25f.engine().top_k(query, k, allowed)
+        merged = {}
+        for idx, score in hits:
+            source, table, row_idx = index.locate(idx)
+            result = table.row(row_idx, _source_config(source)[2])
+            title_col = _title_col(source)
+            key = str(table.row(row_idx, [title_col]).get(title_col, "")).strip().lower() or idx
+            if key in merged:
+                merged[key]["Source"] += f", {source}"
+            else:
+                merged[key] = {"Source": source, **result}
+        if len(merged) >= max_results or len(hits) < k:
+            break
+        k *= 2
+
+    results = list(merged.values())[:max_results]
+    return {
+        "domain": "all",
+        "sources": sources,
+        "query": query,
+        "file": ", ".join(str(_source_config(source)[0].relative_to(DATA_DIR)) for source in sources),
+        "count": len(results),
+        "results": results
+    }
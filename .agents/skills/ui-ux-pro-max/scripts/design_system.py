@@ -13,12 +13,17 @@ Usage:
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
 """
 
+import copy
 import csv
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, search_many, cache_stats, DATA_DIR, _cache_path, _read_cache, _signature, _write_cache
 
 
 # ============ CONFIGURATION ============
@@ -32,92 +37,229 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+PLANNER_WORKERS = 4
+
+
+# ============ QUERY PLANNER ============
+class QueryPlanner:
+    """Runs batches of (query, domain, max_results) searches against the shared warm indexes.
+
+    Each distinct search is executed once. A batch's new searches are grouped by
+    domain and result count; each group is scored with one search_many() call
+    (a single matrix product on the vectorized backend) and groups run concurrently.
+    """
+
+    def __init__(self, max_workers: int = PLANNER_WORKERS):
+        self.max_workers = max_workers
+        self.results = {}
+        self.requested = 0
+
+    def run(self, searches: list) -> list:
+        """Execute searches not seen before and return results in request order."""
+        self.requested += len(searches)
+        groups = {}
+        for key in dict.fromkeys(s for s in searches if s not in self.results):
+            groups.setdefault(key[1:], []).append(key)
+        groups = list(groups.items())
+        if len(groups) == 1:
+            self._run_group(*groups[0])
+        elif groups:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                list(pool.map(lambda group: self._run_group(*group), groups))
+        return [self.results[s] for s in searches]
+
+    def _run_group(self, domain_and_count: tuple, keys: list):
+        domain, max_results = domain_and_count
+        if len(keys) == 1:
+            self.results[keys[0]] = search(keys[0][0], domain, max_results)
+            return
+        for key, result in zip(keys, search_many([key[0] for key in keys], domain, max_results)):
+            self.results[key] = result
+
+    def search(self, query: str, domain: str, max_results: int) -> dict:
+        return self.run([(query, domain, max_results)])[0]
+
+    def stats(self) -> dict:
+        return {"requested": self.requested, "executed": len(self.results)}
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+# ============ REASONING RULES ============
+DEFAULT_REASONING = {
+    "pattern": "Hero + Features + CTA",
+    "style_priority": ["Minimalism", "Flat Design"],
+    "color_mood": "Professional",
+    "typography_mood": "Clean",
+    "key_effects": "Subtle hover transitions",
+    "anti_patterns": "",
+    "decision_rules": {},
+    "severity": "MEDIUM"
+}
+
+
+def _parse_reasoning(rule: dict) -> dict:
+    """Turn one ui-reasoning.csv row into the reasoning dict used by the generator."""
+    # Parse decision rules JSON
+    decision_rules = {}
+    try:
+        decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+    except json.JSONDecodeError:
+        pass
+
+    return {
+        "pattern": rule.get("Recommended_Pattern", ""),
+        "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+        "color_mood": rule.get("Color_Mood", ""),
+        "typography_mood": rule.get("Typography_Mood", ""),
+        "key_effects": rule.get("Key_Effects", ""),
+        "anti_patterns": rule.get("Anti_Patterns", ""),
+        "decision_rules": decision_rules,
+        "severity": rule.get("Severity", "MEDIUM")
+    }
+
+
+# Category words this long also match longer query words they begin
+MIN_PREFIX_LENGTH = 4
+
+
+def _category_tokens(text: str) -> list:
+    return re.findall(r"\w+", text.lower())
+
+
+class ReasoningRules:
+    """ui-reasoning.csv compiled for lookup by category.
+
+    Matching follows the rule order of the CSV: exact category, then a category
+    whose words appear as a run in the query (or the query's words as a run in a
+    category), then the category sharing the rarest words with the query. Every
+    category is indexed by its words at compile time, so a lookup probes each
+    query word (and its prefixes, so "education" matches "educational") and only
+    visits the rules that share a word with it.
+    """
+
+    def __init__(self, compiled: dict):
+        self.rules = compiled["rules"]
+        self.exact = compiled["exact"]          # lowered category -> first rule index
+        self.tokens = compiled["tokens"]        # category words per rule
+        self.postings = compiled["postings"]    # category word -> rule indexes, in CSV order
+        self.reasoning = compiled["reasoning"]  # pre-parsed reasoning per rule
+        self._lookups = {}
+
+    @staticmethod
+    def compile(rules: list) -> dict:
+        exact = {}
+        tokens = []
+        postings = {}
+        for i, rule in enumerate(rules):
+            ui_cat = rule.get("UI_Category", "")
+            exact.setdefault(ui_cat.lower(), i)
+            tokens.append(_category_tokens(ui_cat))
+            for token in dict.fromkeys(tokens[i]):
+                postings.setdefault(token, []).append(i)
+        return {
+            "rules": rules,
+            "exact": exact,
+            "tokens": tokens,
+            "postings": postings,
+            "reasoning": [_parse_reasoning(rule) for rule in rules],
+        }
+
+    def find(self, category: str):
+        """Index of the matching rule, or None."""
+        category_lower = category.lower()
+        if category_lower in self._lookups:
+            return self._lookups[category_lower]
+
+        index = self.exact.get(category_lower)
+        if index is None:
+            query = _category_tokens(category)
+            # Shared words weigh by rarity, so "delivery" outranks the many "app" categories
+            scores = {}
+            for word in dict.fromkeys(query):
+                matches = [word] + [word[:j] for j in range(MIN_PREFIX_LENGTH, len(word))]
+                for match in matches:
+                    for i in self.postings.get(match, ()):
+                        scores[i] = scores.get(i, 0.0) + 1.0 / len(self.postings[match])
+            candidates = sorted(scores)
+            # Partial match: a rule category inside this one, or this one inside a rule category
+            index = next((i for i in candidates if _contains_run(query, self.tokens[i])
+                          or _contains_run(self.tokens[i], query)), None)
+            if index is None and candidates:
+                # Keyword match
+                index = max(candidates, key=lambda i: (scores[i], -i))
+
+        self._lookups[category_lower] = index
+        return index
+
+
+def _contains_run(tokens: list, run: list) -> bool:
+    """Whether `run` occurs as consecutive words of `tokens`"""
+    n = len(run)
+    return n > 0 and any(tokens[i:i + n] == run for i in range(len(tokens) - n + 1))
+
+
+# filepath -> (source signature, ReasoningRules)
+_REASONING_TABLES = {}
+
+
+def load_reasoning_rules(filepath: Path = None) -> ReasoningRules:
+    """Compiled reasoning rules, shared in-process and cached next to the search indexes."""
+    filepath = filepath or DATA_DIR / REASONING_FILE
+    if not filepath.exists():
+        return ReasoningRules(ReasoningRules.compile([]))
+    signature = _signature(filepath)
+    cached = _REASONING_TABLES.get(filepath)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    cache_path = _cache_path(filepath, ["reasoning", "tokens"])
+    compiled = _read_cache(cache_path, signature)
+    if compiled is None:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            compiled = ReasoningRules.compile(list(csv.DictReader(f)))
+        _write_cache(cache_path, signature, compiled)
+
+    table = ReasoningRules(compiled)
+    _REASONING_TABLES[filepath] = (signature, table)
+    return table
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
-
-    def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+    def __init__(self, planner: QueryPlanner = None):
+        self.reasoning_rules = load_reasoning_rules()
+        self.reasoning_data = self.reasoning_rules.rules
+        self.planner = planner or QueryPlanner()
 
     def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
         """Execute searches across multiple domains."""
-        results = {}
+        searches = []
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                searches.append((combined_query, domain, config["max_results"]))
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                searches.append((query, domain, config["max_results"]))
+        return dict(zip(SEARCH_CONFIG, self.planner.run(searches)))
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        index = self.reasoning_rules.find(category)
+        return self.reasoning_data[index] if index is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
-
-        if not rule:
-            return {
-                "pattern": "Hero + Features + CTA",
-                "style_priority": ["Minimalism", "Flat Design"],
-                "color_mood": "Professional",
-                "typography_mood": "Clean",
-                "key_effects": "Subtle hover transitions",
-                "anti_patterns": "",
-                "decision_rules": {},
-                "severity": "MEDIUM"
-            }
-
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
-        return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
-        }
+        index = self.reasoning_rules.find(category)
+        if index is None:
+            return copy.deepcopy(DEFAULT_REASONING)
+        return copy.deepcopy(self.reasoning_rules.reasoning[index])
 
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
         """Select best matching result based on priority keywords."""
@@ -160,22 +302,36 @@ class DesignSystemGenerator:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
-    def generate(self, query: str, project_name: str = None) -> dict:
+    def generate(self, query: str, project_name: str = None, page: str = None, page_query: str = None) -> dict:
         """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        start = time.perf_counter()
+        timings = {}
+
+        # Step 1: Search product to get category, together with every search that
+        # does not depend on it (all domains but style, plus page override searches)
+        stage = time.perf_counter()
+        independent = [(query, "product", 1)]
+        independent += [(query, domain, config["max_results"]) for domain, config in SEARCH_CONFIG.items() if domain != "style"]
+        if page:
+            independent += _override_searches(page, page_query)
+        product_result = self.planner.run(independent)[0]
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
+        timings["independent_searches_ms"] = _ms_since(stage)
 
         # Step 2: Get reasoning rules for this category
+        stage = time.perf_counter()
         reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
+        timings["reasoning_ms"] = _ms_since(stage)
 
-        # Step 3: Multi-domain search with style priority hints
+        # Step 3: Multi-domain search with style priority hints (only style is new here)
+        stage = time.perf_counter()
         search_results = self._multi_domain_search(query, style_priority)
         search_results["product"] = product_result  # Reuse product search
+        timings["style_search_ms"] = _ms_since(stage)
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -193,6 +349,9 @@ class DesignSystemGenerator:
         style_effects = best_style.get("Effects & Animation", "")
         reasoning_effects = reasoning.get("key_effects", "")
         combined_effects = style_effects if style_effects else reasoning_effects
+        timings["total_ms"] = _ms_since(start)
+        timings["searches"] = self.planner.stats()
+        timings["result_cache"] = cache_stats()
 
         return {
             "project_name": project_name or query.upper(),
@@ -232,7 +391,8 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
-            "severity": reasoning.get("severity", "MEDIUM")
+            "severity": reasoning.get("severity", "MEDIUM"),
+            "timings": timings
         }
 
 
@@ -467,7 +627,7 @@ def generate_design_system(query: str, project_name: str = None, output_format:
     Args:
         query: Search query (e.g., "SaaS dashboard", "e-commerce luxury")
         project_name: Optional project name for output header
-        output_format: "ascii" (default) or "markdown"
+        output_format: "ascii" (default), "markdown", or "json" (the raw design system, with stage timings)
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
@@ -476,19 +636,24 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         Formatted design system string
     """
     generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    design_system = generator.generate(query, project_name, page=page if persist else None, page_query=query)
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        stage = time.perf_counter()
+        persist_design_system(design_system, page, output_dir, query, planner=generator.planner)
+        design_system["timings"]["persist_ms"] = _ms_since(stage)
 
+    if output_format == "json":
+        return json.dumps(design_system, indent=2, ensure_ascii=False)
     if output_format == "markdown":
         return format_markdown(design_system)
     return format_ascii_box(design_system)
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None,
+                          planner: QueryPlanner = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
@@ -497,6 +662,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        planner: Optional QueryPlanner holding searches already run for this design system
     
     Returns:
         dict with created file paths and status
@@ -520,17 +686,12 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # Generate and write MASTER.md
     master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
+    _write_atomic(master_file, master_content)
     created_files.append(str(master_file))
     
     # If page is specified, create page override file with intelligent content
     if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+        created_files.append(_persist_page_override(design_system, design_system_dir, page, page_query, planner))
     
     return {
         "status": "success",
@@ -539,6 +700,23 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     }
 
 
+def _persist_page_override(design_system: dict, design_system_dir: Path, page: str, page_query: str = None,
+                           planner: QueryPlanner = None) -> str:
+    """Write design-system/<project>/pages/<page>.md and return its path."""
+    page_file = design_system_dir / "pages" / f"{page.lower().replace(' ', '-')}.md"
+    page_content = format_page_override_md(design_system, page, page_query, planner)
+    _write_atomic(page_file, page_content)
+    return str(page_file)
+
+
+def _write_atomic(path: Path, content: str):
+    """Write via a temporary file and rename, so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
 def format_master_md(design_system: dict) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
@@ -802,14 +980,14 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None, planner: QueryPlanner = None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, planner)
     
     lines = []
     
@@ -911,23 +1089,27 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+def _override_searches(page_name: str, page_query: str) -> list:
+    """The (query, domain, max_results) searches behind a page override file."""
+    combined_context = f"{page_name.lower()} {(page_query or '').lower()}"
+    return [
+        (combined_context, "style", 1),
+        (combined_context, "ux", 3),
+        (combined_context, "landing", 1),
+    ]
+
+
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict, planner: QueryPlanner = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
+    combined_context = f"{page_name.lower()} {(page_query or '').lower()}"
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    style_search, ux_search, landing_search = (planner or QueryPlanner()).run(_override_searches(page_name, page_query))
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -1052,6 +1234,124 @@ def _detect_page_type(context: str, style_results: list) -> str:
     return "General"
 
 
+# ============ BATCH GENERATION ============
+def load_manifest(manifest_path: str) -> dict:
+    """
+    Load a batch manifest (JSON, or YAML when PyYAML is installed):
+
+        {"projects": [
+            {"name": "Acme", "query": "saas analytics dashboard",
+             "pages": ["dashboard", {"name": "checkout", "query": "checkout payment"}]}
+        ]}
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if str(manifest_path).endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("YAML manifests require PyYAML (pip install pyyaml); or use a JSON manifest")
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        manifest = {"projects": manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("projects", []), list):
+        raise ValueError("Manifest must be a list of projects or an object with a \"projects\" list")
+    slugs = set()
+    for n, project in enumerate(manifest.get("projects", []), 1):
+        if not isinstance(project, dict):
+            raise ValueError(f"Manifest project {n} must be an object")
+        if not isinstance(project.get("query"), str):
+            raise ValueError(f"Manifest project {n} is missing a query: {project}")
+        pages = project.get("pages", [])
+        if not isinstance(pages, list):
+            raise ValueError(f"Manifest project {n} pages must be a list")
+        for page in pages:
+            if not isinstance(page, (str, dict)) or (isinstance(page, dict) and not isinstance(page.get("name"), str)):
+                raise ValueError(f"Manifest project {n} page {page!r} must be a name or an object with a name")
+        slug = (project.get("name") or project["query"].upper()).lower().replace(' ', '-')
+        if slug in slugs:
+            raise ValueError(f"Two manifest projects write to design-system/{slug}/")
+        slugs.add(slug)
+    return manifest
+
+
+def _generate_batch_item(project: dict, output_dir: str) -> dict:
+    """Generate and persist one manifest project with all of its pages."""
+    start = time.perf_counter()
+    query = project["query"]
+    pages = [(page, query) if isinstance(page, str) else (page["name"], page.get("query", query))
+             for page in project.get("pages", [])]
+    item = {"project": project.get("name") or query.upper(), "pages": len(pages)}
+    try:
+        generator = DesignSystemGenerator()
+        # Prefetch every page's override searches alongside the project's own
+        generator.planner.run([s for name, page_query in pages for s in _override_searches(name, page_query)])
+        design_system = generator.generate(query, project.get("name"))
+
+        stage = time.perf_counter()
+        persisted = persist_design_system(design_system, None, output_dir, query, planner=generator.planner)
+        design_system_dir = Path(persisted["design_system_dir"])
+        for name, page_query in pages:
+            persisted["created_files"].append(
+                _persist_page_override(design_system, design_system_dir, name, page_query, generator.planner))
+        design_system["timings"]["persist_ms"] = _ms_since(stage)
+
+        item["files"] = persisted["created_files"]
+        item["timings"] = design_system["timings"]
+    except Exception as e:
+        item["error"] = f"{type(e).__name__}: {e}"
+    item["ms"] = _ms_since(start)
+    return item
+
+
+def generate_design_system_batch(manifest_path: str, output_dir: str = None, workers: int = None) -> dict:
+    """
+    Generate and persist design systems for every project and page in a manifest.
+
+    Search indexes and reasoning rules are loaded once and shared by all workers.
+
+    Returns:
+        dict with per-item results and timings, and the batch total
+    """
+    start = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    output_dir = output_dir or manifest.get("output_dir")
+    projects = manifest.get("projects", [])
+    workers = workers or min(len(projects), os.cpu_count() or 1) or 1
+
+    load_reasoning_rules()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        items = list(pool.map(lambda project: _generate_batch_item(project, output_dir), projects))
+
+    return {
+        "items": items,
+        "projects": len(items),
+        "pages": sum(item["pages"] for item in items),
+        "failed": sum(1 for item in items if "error" in item),
+        "workers": workers,
+        "total_ms": _ms_since(start),
+        "result_cache": cache_stats(),
+    }
+
+
+def format_batch_summary(summary: dict) -> str:
+    """Human-readable summary of generate_design_system_batch()."""
+    lines = []
+    for item in summary["items"]:
+        if "error" in item:
+            lines.append(f"FAILED  {item['project']}: {item['error']}")
+        else:
+            lines.append(f"OK      {item['project']}: {len(item['files'])} files in {item['ms']:.1f} ms")
+    lines.append("")
+    lines.append(f"{summary['projects']} projects, {summary['pages']} pages, {summary['failed']} failed, "
+                 f"{summary['workers']} workers, {summary['total_ms']:.1f} ms total")
+    cache = summary["result_cache"]
+    lines.append(f"Search cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%} hit rate)")
+    return "\n".join(lines)
+
+
 # ============ CLI SUPPORT ============
 if __name__ == "__main__":
     import argparse
@@ -1,114 +1,215 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
-       python search.py "<query>" --design-system [-p "Project Name"]
-       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
-
-Domains: style, prompt, color, chart, landing, product, ux, typography
-Stacks: html-tailwind, react, nextjs
-
-Persistence (Master + Overrides pattern):
-  --persist    Save design system to design-system/MASTER.md
-  --page       Also create a page-specific override file in design-system/pages/
-"""
-
-import argparse
-import sys
-import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
-
-# Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
-if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-
-
-def format_output(result):
-    """Format results for Claude consumption (token-optimized)"""
-    if "error" in result:
-        return f"Error: {result['error']}"
-
-    output = []
-    if result.get("stack"):
-        output.append(f"## UI Pro Max Stack Guidelines")
-        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
-    else:
-        output.append(f"## UI Pro Max Search Results")
-        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
-
-    for i, row in enumerate(result['results'], 1):
-        output.append(f"### Result {i}")
-        for key, value in row.items():
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
-            output.append(f"- **{key}:** {value_str}")
-        output.append("")
-
-    return "\n".join(output)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
-    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
-    parser.add_argument("--json", action="store_true", help="Output as JSON")
-    # Design system generation
-    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
-    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
-    # Persistence (Master + Overrides pattern)
-    parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
-    parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
-
-    args = parser.parse_args()
-
-    # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
-        print(result)
-        
-        # Print persistence confirmation
-        if args.persist:
-            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
-            print("\n" + "=" * 60)
-            print(f"✅ Design system persisted to design-system/{project_slug}/")
-            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
-                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
-            print("")
-            print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
-            print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
-            print("=" * 60)
-    # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
-    # Domain search
-    else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --stack react nextjs html-tailwind
+       python search.py "<query>" --sources ux web stack:react   (or --sources all)
+       python search.py "<query>" --design-system [-p "Project Name"]
+       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --manifest projects.json [-o out/] [--workers 4] [--json]
+       python search.py --serve [--stdio]
+       python search.py --build
+
+Domains: style, prompt, color, chart, landing, product, ux, typography
+Stacks: html-tailwind, react, nextjs
+
+Persistence (Master + Overrides pattern):
+  --persist    Save design system to design-system/MASTER.md
+  --page       Also create a page-specific override file in design-system/pages/
+  --manifest   Persist design systems for every project and page listed in a JSON/YAML manifest
+
+Build:
+  --build      Compile every CSV into a memory-mapped columnar index file (otherwise done on first search)
+
+Server mode:
+  --serve      Keep every index warm in a background process (Unix socket, or stdio with --stdio).
+               While it runs, search.py forwards queries to it instead of loading the data itself.
+  --no-server  Always search in-process
+"""
+
+import argparse
+import os
+import sys
+from core import CSV_CONFIG, AVAILABLE_STACKS, AVAILABLE_SOURCES, MAX_RESULTS, search, search_stack, search_all
+
+# design_system and server are imported only by the commands that use them: agents run
+# this CLI many times per session, and a plain search should not pay for either.
+
+
+def use_utf8_stdio():
+    """Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)"""
+    for stream in (sys.stdout, sys.stderr):
+        if stream.encoding and stream.encoding.lower() not in ('utf-8', 'utf8'):
+            stream.reconfigure(encoding='utf-8')
+
+
+def format_output(result):
+    """Format results for Claude consumption (token-optimized)"""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    output = []
+    if result.get("sources"):
+        output.append(f"## UI Pro Max Cross-Source Results")
+        output.append(f"**Sources:** {', '.join(result['sources'])} | **Query:** {result['query']}")
+    elif result.get("stack"):
+        output.append(f"## UI Pro Max Stack Guidelines")
+        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
+    else:
+        output.append(f"## UI Pro Max Search Results")
+        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
+    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+
+    for i, row in enumerate(result['results'], 1):
+        output.append(f"### Result {i}")
+        for key, value in row.items():
+            value_str = str(value)
+            if len(value_str) > 300:
+                value_str = value_str[:300] + "..."
+            output.append(f"- **{key}:** {value_str}")
+        output.append("")
+
+    return "\n".join(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Search")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
+    parser.add_argument("--stack", "-s", nargs="+", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs); several stacks are searched together")
+    parser.add_argument("--sources", nargs="+", choices=AVAILABLE_SOURCES + ["all"], help="Search any mix of domains and stack:<name> sources in one merged ranking")
+    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON (with --design-system: the raw design system and stage timings)")
+    # Design system generation
+    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
+    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
+    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    # Persistence (Master + Overrides pattern)
+    parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
+    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Batch generation
+    parser.add_argument("--manifest", type=str, default=None, help="Generate and persist design systems for every project/page in a JSON or YAML manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads for --manifest (default: CPU count)")
+    # Build step
+    parser.add_argument("--build", action="store_true", help="Compile every CSV into its columnar index file and exit")
+    # Server mode
+    parser.add_argument("--serve", action="store_true", help="Run a search server that keeps all indexes warm")
+    parser.add_argument("--stdio", action="store_true", help="With --serve, speak JSON-RPC on stdin/stdout instead of a Unix socket")
+    parser.add_argument("--no-server", action="store_true", help="Do not forward queries to a running server")
+
+    args = parser.parse_args()
+    use_utf8_stdio()
+
+    if args.build:
+        import time
+        from core import INDEX_CACHE_DIR, build_tables
+        start = time.perf_counter()
+        built = build_tables()
+        print(f"Compiled {len(built)} tables ({sum(size for _, _, size in built) / 1024:.0f} KB) "
+              f"into {INDEX_CACHE_DIR} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        sys.exit(0)
+    if args.serve:
+        import server
+        if args.stdio:
+            server.serve_stdio()
+        else:
+            server.serve_socket()
+        sys.exit(0)
+    if args.manifest:
+        from design_system import generate_design_system_batch, format_batch_summary
+        try:
+            summary = generate_design_system_batch(args.manifest, args.output_dir, args.workers)
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid manifest: {e}")
+        if args.json:
+            import json
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+        else:
+            print(format_batch_summary(summary))
+        sys.exit(1 if summary["failed"] else 0)
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
+    def call(method, params, fallback):
+        """Forward to a running server if there is one, otherwise run in-process"""
+        result = None
+        if not args.no_server:
+            import server
+            try:
+                result = server.request(method, params)
+            except (RuntimeError, ValueError, KeyError) as e:
+                # e.g. a stale server still running older code: answer from this process instead
+                print(f"Note: search server failed ({e}); searching in-process", file=sys.stderr)
+                result = None
+        return fallback() if result is None else result
+
+    # Design system takes priority
+    if args.design_system:
+        from design_system import generate_design_system
+        # The server has its own working directory, so persist paths are resolved here
+        output_dir = os.path.abspath(args.output_dir or os.getcwd())
+        output_format = "json" if args.json else args.format
+        result = call("design_system", {
+            "query": args.query,
+            "project_name": args.project_name,
+            "format": output_format,
+            "persist": args.persist,
+            "page": args.page,
+            "output_dir": output_dir,
+        }, lambda: generate_design_system(
+            args.query, 
+            args.project_name, 
+            output_format,
+            persist=args.persist,
+            page=args.page,
+            output_dir=output_dir
+        ))
+        print(result)
+        
+        # Print persistence confirmation (kept out of JSON output)
+        if args.persist and not args.json:
+            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
+            print("\n" + "=" * 60)
+            print(f"✅ Design system persisted to design-system/{project_slug}/")
+            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
+            if args.page:
+                page_filename = args.page.lower().replace(' ', '-')
+                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
+            print("")
+            print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
+            print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
+            print("=" * 60)
+    # Cross-source search
+    elif args.sources or (args.stack and len(args.stack) > 1):
+        if args.sources and "all" in args.sources:
+            sources = []  # every domain and stack
+        else:
+            sources = list(args.sources or []) + [f"stack:{stack}" for stack in args.stack or []]
+        result = call("search_all", {"query": args.query, "sources": sources, "max_results": args.max_results},
+                      lambda: search_all(args.query, sources, args.max_results))
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Stack search
+    elif args.stack:
+        stack = args.stack[0]
+        result = call("search_stack", {"query": args.query, "stack": stack, "max_results": args.max_results},
+                      lambda: search_stack(args.query, stack, args.max_results))
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Domain search
+    else:
+        result = call("search", {"query": args.query, "domain": args.domain, "max_results": args.max_results},
+                      lambda: search(args.query, args.domain, args.max_results))
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Server - keeps every search index warm in one long-running process
+
+Speaks newline-delimited JSON-RPC 2.0 over a Unix socket (default) or stdio:
+    {"jsonrpc": "2.0", "id": 1, "method": "search", "params": {"query": "saas", "domain": "style"}}
+
+Methods: search, search_stack, search_all, design_system, stats, ping, shutdown
+
+Usage: python search.py --serve [--stdio]
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SOCKET_PATH = Path(tempfile.gettempdir()) / f"ui-ux-pro-max-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock"
+CLIENT_TIMEOUT = 10.0
+
+
+# ============ CLIENT ============
+def request(method, params=None, socket_path=SOCKET_PATH, timeout=CLIENT_TIMEOUT):
+    """Send one call to a running server. Returns the result, or None if no server is reachable."""
+    if not Path(socket_path).exists():
+        return None
+    # Imported only once a socket file exists, so search.py pays nothing when no server runs
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"]["message"])
+    return response["result"]
+
+
+# ============ SERVER ============
+def _call(method, params):
+    """Dispatch one JSON-RPC method to the in-process search functions"""
+    from core import search, search_stack, search_all
+    if method == "search":
+        return search(params["query"], params.get("domain"), params.get("max_results", 3))
+    if method == "search_stack":
+        return search_stack(params["query"], params["stack"], params.get("max_results", 3))
+    if method == "search_all":
+        return search_all(params["query"], params.get("sources"), params.get("max_results", 3))
+    if method == "design_system":
+        from design_system import generate_design_system
+        return generate_design_system(
+            params["query"],
+            params.get("project_name"),
+            params.get("format", "ascii"),
+            persist=params.get("persist", False),
+            page=params.get("page"),
+            output_dir=params.get("output_dir"),
+        )
+    if method == "stats":
+        from core import cache_stats
+        return {"result_cache": cache_stats()}
+    if method == "ping":
+        return {"pid": os.getpid()}
+    raise KeyError(f"Unknown method: {method}")
+
+
+def _handle_line(line):
+    """Answer one request line; returns (response line, shutdown requested)"""
+    msg_id = None
+    try:
+        msg = json.loads(line)
+        msg_id = msg.get("id")
+        method = msg["method"]
+        if method == "shutdown":
+            return {"jsonrpc": "2.0", "id": msg_id, "result": "ok"}, True
+        return {"jsonrpc": "2.0", "id": msg_id, "result": _call(method, msg.get("params") or {})}, False
+    except Exception as e:
+        return {"jsonrpc": "2.0", "id": msg_id, "error": {"code": -32000, "message": f"{type(e).__name__}: {e}"}}, False
+
+
+def warm_indexes():
+    """Build every domain and stack index up front so the first query is fast"""
+    from core import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, DATA_DIR, _get_index, _get_unified_index
+    count = 0
+    for config in CSV_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            _get_index(filepath, config["search_cols"], config.get("field_weights"))[1].engine()
+            count += 1
+    for config in STACK_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            _get_index(filepath, _STACK_COLS["search_cols"], _STACK_COLS["field_weights"])[1].engine()
+            count += 1
+    _get_unified_index().bm25f.engine()
+    return count + 1
+
+
+def serve_stdio(stdin=sys.stdin, stdout=sys.stdout):
+    """Serve requests from stdin, one JSON object per line, until EOF or shutdown"""
+    warm_indexes()
+    for line in stdin:
+        if not line.strip():
+            continue
+        response, stop = _handle_line(line)
+        stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        stdout.flush()
+        if stop:
+            break
+
+
+def serve_socket(socket_path=SOCKET_PATH):
+    """Serve requests on a Unix socket until a shutdown request arrives"""
+    import socket
+    import threading
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix sockets are not available on this platform; use --serve --stdio")
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if request("ping", socket_path=socket_path, timeout=1.0) is not None:
+            raise RuntimeError(f"A server is already running on {socket_path}")
+        socket_path.unlink()
+
+    count = warm_indexes()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(str(socket_path))
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    print(f"Serving {count} indexes on {socket_path} (pid {os.getpid()})", file=sys.stderr, flush=True)
+
+    stopping = threading.Event()
+
+    def handle(conn):
+        with conn, conn.makefile("rb") as reader, conn.makefile("wb") as writer:
+            for line in reader:
+                response, stop = _handle_line(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                writer.flush()
+                if stop:
+                    stopping.set()
+                    # Wake the accept() loop so it notices the shutdown
+                    try:
+                        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+                            wake.connect(str(socket_path))
+                    except OSError:
+                        pass
+                    return
+
+    try:
+        while not stopping.is_set():
+            conn, _ = server.accept()
+            if stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    if "--stdio" in sys.argv:
+        serve_stdio()
+    else:
+        serve_socket()
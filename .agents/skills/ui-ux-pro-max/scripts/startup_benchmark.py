@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark for search.py - import time of each CLI path, checked against a budget
+
+Each command runs under `python -X importtime` (after one warm-up run, with bytecode
+cached in the temp directory) and the best-of-N import time of everything search.py
+loads beyond the bare interpreter is measured. Budgets are multiples of the import
+time of the standard-library modules every command needs, sampled alongside, so
+they hold on slower or busy machines. A command also fails if it imports a module
+it has no use for (e.g. design_system for a plain search).
+
+Usage: python startup_benchmark.py [--runs 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SEARCH_PY = Path(__file__).parent / "search.py"
+
+# Standard-library imports no search.py command can avoid; the unit of every budget
+FLOOR = "import argparse, bisect, heapq, json, os, pathlib, re, tempfile, threading"
+
+# (label, search.py arguments, import budget as a multiple of FLOOR, modules that must not be imported)
+CASES = [
+    ("domain search", ["dark mode", "--domain", "style", "--no-server"], 1.4,
+     ["design_system", "concurrent.futures", "socket", "numpy"]),
+    ("stack search", ["forms", "--stack", "react", "--no-server"], 1.4,
+     ["design_system", "concurrent.futures", "socket", "numpy"]),
+    ("server client", ["dark mode", "--domain", "style"], 1.4,
+     ["design_system", "concurrent.futures", "numpy"]),
+    ("design system", ["fintech dashboard", "--design-system", "--no-server"], 2.5,
+     ["socket", "numpy"]),
+]
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} for the top-level imports in -X importtime output"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def imported_modules(stderr):
+    return {line.rsplit("|", 1)[1].strip() for line in stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line}
+
+
+def run_importtime(args, env):
+    result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                            capture_output=True, text=True, env=env, cwd=SEARCH_PY.parent)
+    return result.stderr
+
+
+def import_ms(stderr, baseline):
+    """Import time of everything loaded beyond the bare interpreter"""
+    return sum(us for name, us in parse_importtime(stderr).items() if name not in baseline) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search.py startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command (default: 5)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = str(Path(tempfile.gettempdir()) / "ui-ux-pro-max-pycache")
+
+    baseline = set(parse_importtime(run_importtime(["-c", "pass"], env)))
+    failures = 0
+    for label, search_args, budget, forbidden in CASES:
+        command = [str(SEARCH_PY), *search_args]
+        run_importtime(command, env)  # warm-up: bytecode and index caches
+        floor_samples, samples, modules = [], [], set()
+        for _ in range(args.runs):
+            floor_samples.append(import_ms(run_importtime(["-c", FLOOR], env), baseline))
+            stderr = run_importtime(command, env)
+            samples.append(import_ms(stderr, baseline))
+            modules |= imported_modules(stderr)
+
+        # Best of N: scheduler noise only ever adds time
+        best, floor = min(samples), min(floor_samples)
+        unwanted = sorted(m for m in forbidden if m in modules)
+        ok = best <= budget * floor and not unwanted
+        failures += not ok
+        note = f"  imports {', '.join(unwanted)}" if unwanted else ""
+        print(f"{'OK  ' if ok else 'FAIL'}  {label:<14} {best:6.1f} ms = {best / floor:.2f}x stdlib floor "
+              f"(budget {budget:.1f}x){note}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()